@@ -0,0 +1,99 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Modules that must only load when a command actually needs them
+HEAVY_MODULES = ["mlflow", "xgboost", "sklearn"]
+
+# (name, interpreter arguments) run from the repository root
+TARGETS = [
+    ("api", ["-c", "import deployment.api"]),
+    ("prepare-data", ["data_processing/prepare_features.py", "--help"]),
+    ("train-model", ["experiments/train_model.py", "--help"]),
+    ("export-model", ["deployment/model_bundle.py", "--help"]),
+    ("forecast-table", ["deployment/forecast_table.py", "--help"]),
+    ("monitor-daemon", ["monitoring/daemon.py", "--help"]),
+    ("pipeline", ["infra/pipeline.py", "--help"]),
+    ("load-test", ["benchmarks/load_test.py", "--help"]),
+    ("monitor", ["monitoring/monitor.py", "--help"]),
+    ("predict", ["experiments/predict.py", "--help"]),
+    ("backtest", ["experiments/backtest.py", "--help"]),
+    ("fetch-intensity", ["data_ingestion/fetch_intensity.py", "--help"]),
+    ("synthetic-data", ["data_ingestion/synthetic.py", "--help"]),
+    ("validate-raw", ["data_processing/validate_raw.py", "--help"]),
+    ("scale-test", ["benchmarks/scale_test.py", "--help"]),
+    ("micro-benchmarks", ["benchmarks/micro.py", "--help"]),
+]
+
+
+def measure(args, repeats=3):
+    """Best wall time of `repeats` fresh interpreters and the modules they import"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        best = min(best, time.perf_counter() - start)
+    # -X importtime lines: "import time: self [us] | cumulative | name"
+    imported, top_level = set(), {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or not parts[1].strip().isdigit():
+            continue
+        imported.add(parts[2].strip().split(".")[0])
+        # Entries are indented two spaces per level; keep the first two levels
+        if len(parts[2]) - len(parts[2].lstrip()) <= 3:
+            top_level[parts[2].strip()] = int(parts[1]) / 1e6
+    slowest = sorted(top_level.items(), key=lambda item: -item[1])[:5]
+    return {
+        "seconds": best,
+        "returncode": result.returncode,
+        "heavy_imports": sorted(imported & set(HEAVY_MODULES)),
+        "slowest_imports": dict(slowest),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI and API startup time")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Save results as JSON")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    args = parser.parse_args()
+
+    results = {"timestamp": datetime.now().isoformat(), "targets": {}}
+    failed = False
+    for name, target_args in TARGETS:
+        result = measure(target_args, args.repeats)
+        results["targets"][name] = result
+        heavy = ", ".join(result["heavy_imports"]) or "-"
+        print(f"{name:16s} {result['seconds']:6.2f}s  heavy imports: {heavy}")
+        if result["returncode"] != 0 or result["heavy_imports"]:
+            failed = True
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["targets"]
+        for name, result in results["targets"].items():
+            if name in baseline:
+                change = result["seconds"] / baseline[name]["seconds"] - 1
+                print(f"{name}: {change:+.1%}")
+                failed |= change > args.threshold
+    if failed:
+        print("Startup regression: heavy import, failed command or slower start")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
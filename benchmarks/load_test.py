@@ -0,0 +1,260 @@
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import requests
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.config import STATE_CODES
+from deployment.config import STATE_ENCODING, TYPE_ENCODING
+from experiments.config import FEATURE_COLUMNS
+
+STATES_BY_CODE = {code: state for state, code in STATE_ENCODING.items()}
+TYPES_BY_CODE = {code: name for name, code in TYPE_ENCODING.items()}
+
+
+def prediction_payload(record):
+    """/predict payload that reproduces a prediction log record, or None
+
+    Logged features are encoded in training order; batch rows carry no state
+    or type, so those are decoded from the encoded columns.
+    """
+    features = record["features"]
+    if features is None:
+        # Answered from the forecast table: only the lookup can be replayed
+        if not record.get("target_time"):
+            return None
+        return {
+            "state": record["state"],
+            "intensity_type": record["type"],
+            "target_time": record["target_time"],
+        }
+    values = dict(zip(FEATURE_COLUMNS, features))
+    payload = {
+        "state": record["state"] or STATES_BY_CODE[int(values["state_encoded"])],
+        "intensity_type": record["type"] or TYPES_BY_CODE[int(values["type_encoded"])],
+        "hour": int(values["hour"]),
+        "day_of_week": int(values["day_of_week"]),
+        "month": int(values["month"]),
+        "quarter": int(values["quarter"]),
+        "is_weekend": bool(values["is_weekend"]),
+        **{c: float(values[c]) for c in FEATURE_COLUMNS if c.startswith("value_")},
+    }
+    if record.get("target_time"):
+        payload["target_time"] = record["target_time"]
+    return payload
+
+
+def load_request_log(path):
+    """(path, payload) pairs from a JSONL log, or a directory of them
+
+    Lines are {"path": ..., "payload": ...}, a bare /predict payload, or a
+    prediction log record (deployment/prediction_logger.py), which is turned
+    back into the /predict request that produced it.
+    """
+    path = Path(path)
+    files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+    entries = []
+    for file in files:
+        with open(file) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "payload" in record:
+                    entries.append((record.get("path", "/predict"), record["payload"]))
+                elif "prediction" in record and "features" in record:
+                    payload = prediction_payload(record)
+                    if payload is not None:
+                        entries.append(("/predict", payload))
+                else:
+                    entries.append(("/predict", record))
+    return entries
+
+
+def synthesize_requests(count, repeat_fraction=0.3, seed=42):
+    """Mix of /predict payloads; a share repeats earlier ones like dashboards do"""
+    rng = np.random.default_rng(seed)
+    entries = []
+    for _ in range(count):
+        if entries and rng.random() < repeat_fraction:
+            entries.append(entries[rng.integers(len(entries))])
+            continue
+        day_of_week = int(rng.integers(0, 7))
+        month = int(rng.integers(1, 13))
+        lags = rng.normal(300, 80, 6).round(1)
+        payload = {
+            "state": str(rng.choice(STATE_CODES)),
+            "intensity_type": str(rng.choice(["consumption", "production"])),
+            "hour": int(rng.integers(0, 24)),
+            "day_of_week": day_of_week,
+            "month": month,
+            "quarter": (month - 1) // 3 + 1,
+            "is_weekend": day_of_week >= 5,
+            **{
+                f"value_lag_{lag}": float(value)
+                for lag, value in zip([1, 2, 3, 24, 48, 168], lags)
+            },
+        }
+        entries.append(("/predict", payload))
+    return entries
+
+
+def run_load(url, entries, total, concurrency=8, rate=None):
+    """Send `total` requests cycling through entries
+
+    With a rate, requests are scheduled at fixed intervals (open loop) and
+    latency is measured from the scheduled time, so a slow server cannot hide
+    queueing delay. Otherwise `concurrency` workers send back to back.
+    """
+    sessions = threading.local()
+    latencies = np.empty(total)
+    errors = np.zeros(total, dtype=bool)
+
+    def send(i, path, payload, scheduled):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        try:
+            response = sessions.session.post(url + path, json=payload, timeout=30)
+            errors[i] = response.status_code >= 400
+        except requests.RequestException:
+            errors[i] = True
+        latencies[i] = time.perf_counter() - scheduled
+
+    work = list(enumerate(itertools.islice(itertools.cycle(entries), total)))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate:
+            for i, (path, payload) in work:
+                scheduled = start + i / rate
+                time.sleep(max(0.0, scheduled - time.perf_counter()))
+                pool.submit(send, i, path, payload, scheduled)
+        else:
+            chunks = [work[w::concurrency] for w in range(concurrency)]
+
+            def worker(chunk):
+                for i, (path, payload) in chunk:
+                    send(i, path, payload, time.perf_counter())
+
+            list(pool.map(worker, chunks))
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "target_rate": rate,
+        "duration_seconds": elapsed,
+        "throughput_rps": total / elapsed,
+        "error_rate": float(errors.mean()),
+        "latency_ms": {
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "max": latencies.max() * 1000,
+        },
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def compare_to_baseline(results, baseline, threshold=0.2):
+    """Print changes against a baseline run; True if p99 or throughput regressed"""
+    regressed = False
+    for key in ["p50", "p95", "p99"]:
+        change = results["latency_ms"][key] / baseline["latency_ms"][key] - 1
+        print(f"{key}: {change:+.1%}")
+        regressed |= key == "p99" and change > threshold
+    change = results["throughput_rps"] / baseline["throughput_rps"] - 1
+    print(f"throughput: {change:+.1%}")
+    return regressed or change < -threshold
+
+
+def start_server(port):
+    """Start a local uvicorn instance and wait until it answers /health
+
+    The API runs in the current directory, so its relative paths (model
+    bundle, mlruns fallback, logs) resolve there.
+    """
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "deployment.api:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--app-dir",
+            str(Path(__file__).parent.parent),
+        ],
+    )
+    for _ in range(120):
+        try:
+            requests.get(f"http://localhost:{port}/health", timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("API did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay requests against the API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument(
+        "--log", help="JSONL request or prediction log (file or directory) to replay"
+    )
+    parser.add_argument("--synthetic", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None, help="Requests/second")
+    parser.add_argument("--spawn", action="store_true", help="Start a local uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Save results as JSON")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    entries = load_request_log(args.log) if args.log else None
+    entries = entries or synthesize_requests(args.synthetic)
+
+    server = start_server(args.port) if args.spawn else None
+    url = f"http://localhost:{args.port}" if args.spawn else args.url
+    try:
+        results = run_load(
+            url, entries, args.requests or len(entries), args.concurrency, args.rate
+        )
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latency = results["latency_ms"]
+    print(f"Requests:   {results['requests']} ({results['error_rate']:.2%} errors)")
+    print(f"Throughput: {results['throughput_rps']:.1f} req/s")
+    print(
+        f"Latency:    p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, "
+        f"p99 {latency['p99']:.2f} ms"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if compare_to_baseline(results, baseline, args.threshold):
+            print("Regression against baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
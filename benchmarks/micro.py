@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.synthetic import region_codes, synthetic_series
+from data_processing.prepare_features import create_lag_features, create_time_features
+
+SEED = 42
+
+# Benchmark -> input sizes (feature rows, predicted rows or requests)
+SIZES = {
+    "create_time_features": [1_000, 10_000, 100_000],
+    "create_lag_features": [1_000, 10_000, 100_000],
+    "prepare_features": [1_000, 10_000, 100_000],
+    "model_predict": [1, 100, 10_000],
+    "predict_handler": [1, 100, 1_000],
+}
+
+
+def raw_frame(rows, seed=SEED):
+    """Combined raw data of `rows` rows over four (state, type) series"""
+    rng = np.random.default_rng(seed)
+    hours = max(rows // 4, 1)
+    frames = []
+    for state in region_codes(2):
+        for intensity_type in ["consumption", "production"]:
+            df = synthetic_series(
+                rng, "2024-01-01", hours, 300.0, intensity_type == "production", 0, 0
+            )
+            frames.append(df.assign(state=state, type=intensity_type))
+    return pd.concat(frames, ignore_index=True)
+
+
+def feature_frame(rows, seed=SEED):
+    """Processed rows as prepare_ml_dataset writes them"""
+    df = create_lag_features(create_time_features(raw_frame(rows, seed)))
+    return df.dropna().reset_index(drop=True)
+
+
+def prediction_requests(count, seed=SEED):
+    """Distinct /predict requests, so none is answered from the cache"""
+    from deployment.api import PredictionRequest
+
+    rng = np.random.default_rng(seed)
+    lags = rng.normal(300, 80, size=(count, 6)).round(3)
+    return [
+        PredictionRequest(
+            state="BW",
+            hour=int(rng.integers(0, 24)),
+            **dict(zip(["value_lag_1", "value_lag_2", "value_lag_3"], row[:3])),
+            **dict(zip(["value_lag_24", "value_lag_48", "value_lag_168"], row[3:])),
+        )
+        for row in lags
+    ]
+
+
+def setup(name, size, model):
+    """Inputs for one benchmark; returns the call to time"""
+    if name == "create_time_features":
+        df = raw_frame(size)
+        return lambda: create_time_features(df)
+    if name == "create_lag_features":
+        df = create_time_features(raw_frame(size))
+        return lambda: create_lag_features(df)
+    if name == "prepare_features":
+        from experiments.train_model import prepare_features
+
+        df = feature_frame(size)
+        return lambda: prepare_features(df.copy())
+    if name == "model_predict":
+        from benchmarks.wire_format import synthetic_features
+
+        features = synthetic_features(size, seed=SEED)
+        return lambda: model.predict(features)
+    if name == "predict_handler":
+        from deployment import api
+
+        requests = prediction_requests(size)
+        loop = asyncio.new_event_loop()
+
+        async def handle_all():
+            for request in requests:
+                await api.predict(request)
+
+        def run():
+            api.prediction_cache.clear()
+            loop.run_until_complete(handle_all())
+
+        return run
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def measure(call, repeats=5):
+    """Best and median wall time of `repeats` calls after one warm-up call"""
+    call()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return {"seconds": min(times), "median_seconds": statistics.median(times)}
+
+
+def run_benchmarks(names, repeats=5, max_size=None):
+    """Time every benchmark at every size; keys are "name[size]" """
+    from benchmarks.wire_format import synthetic_model
+    from deployment import api
+
+    model = synthetic_model(SEED)
+    # Serve the synthetic model without caching across repeats or logging
+    api.set_model(model, "benchmark")
+    api.prediction_logger = None
+
+    results = {}
+    for name in names:
+        for size in SIZES[name]:
+            if max_size is not None and size > max_size:
+                continue
+            result = measure(setup(name, size, model), repeats)
+            result["per_item_us"] = result["seconds"] / size * 1e6
+            results[f"{name}[{size}]"] = result
+            print(
+                f"{name + '[' + str(size) + ']':32s} {result['seconds'] * 1e3:10.2f}ms"
+                f" {result['per_item_us']:10.2f}us/item"
+            )
+    return results
+
+
+def compare(results, baseline, threshold, min_seconds=0.001):
+    """Benchmarks slower than the baseline by more than threshold
+
+    Timings below min_seconds in both runs are too noisy to judge.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["seconds"], result["seconds"]
+        change = after / before - 1
+        print(
+            f"{key:32s} {before * 1e3:10.2f}ms -> {after * 1e3:10.2f}ms {change:+.1%}"
+        )
+        if change > threshold and max(before, after) >= min_seconds:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark hot paths")
+    parser.add_argument("--only", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-size", type=int, help="Skip larger inputs")
+    parser.add_argument("--output", help="Save results as JSON")
+    parser.add_argument("--compare", help="Results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed slowdown (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    import xgboost
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "seed": SEED,
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "xgboost": xgboost.__version__,
+        },
+        "benchmarks": run_benchmarks(args.only, args.repeats, args.max_size),
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["benchmarks"]
+        regressions = compare(results["benchmarks"], baseline, args.threshold)
+        if regressions:
+            print(f"Slower than baseline by over {args.threshold:.0%}:")
+            for key in regressions:
+                print(f"  {key}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from infra.pipeline import run_command, step
+
+ROOT = Path(__file__).parent.parent
+
+# Tier name -> (regions, years of hourly history)
+SCALE_TIERS = {
+    "1x": (13, 3),
+    "10x-regions": (130, 3),
+    "10x-history": (13, 30),
+    "100x": (130, 30),
+}
+
+
+def tier_steps(tier_dir, regions, years):
+    """Pipeline stages for one tier, all reading and writing inside tier_dir
+
+    The last stage serves the tier's newest registered model with a local
+    API and replays synthetic /predict traffic against it.
+    """
+    raw_dir = tier_dir / "raw"
+    dataset = tier_dir / "ml_dataset.csv"
+    python = sys.executable
+    return [
+        step(
+            "generate",
+            f"{python} {ROOT}/data_ingestion/synthetic.py --output {raw_dir} "
+            f"--regions {regions} --years {years}",
+            timeout=3600,
+        ),
+        step(
+            "prepare-data",
+            f"{python} {ROOT}/data_processing/prepare_features.py "
+            f"--data-dir {raw_dir} --output {dataset}",
+            timeout=3600,
+        ),
+        step(
+            "train-model",
+            f"{python} {ROOT}/experiments/train_model.py --data {dataset}",
+            timeout=7200,
+        ),
+        step(
+            "drift",
+            f"{python} {ROOT}/monitoring/drift.py --data-dir {raw_dir} "
+            f"--state {tier_dir / 'drift_state.json'}",
+            timeout=3600,
+        ),
+        step(
+            "api",
+            f"{python} {ROOT}/benchmarks/load_test.py --spawn --requests 2000 "
+            f"--output {tier_dir / 'load_test.json'}",
+            timeout=600,
+        ),
+    ]
+
+
+def run_tier(tier_dir, regions, years):
+    """Run every stage of a tier as a child process; stops at the first failure
+
+    Returns {stage: {status, seconds, max_rss_kb, cpu_seconds}}; the api
+    stage also reports its load test throughput, p99 and error rate.
+    """
+    tier_dir = tier_dir.resolve()
+    tier_dir.mkdir(parents=True, exist_ok=True)
+    # Keep the benchmark's MLflow runs, artifacts (./mlruns under the working
+    # directory) and the API's relative paths out of the real ones; only the
+    # stages see the tier's store and directory, not this process
+    env = {**os.environ, "MLFLOW_TRACKING_URI": f"sqlite:///{tier_dir}/mlflow.db"}
+    results = {}
+    for spec in tier_steps(tier_dir, regions, years):
+        print(f"  {spec['name']}...", flush=True)
+        start = time.perf_counter()
+        status, error, resources = run_command(spec, env=env, cwd=tier_dir)
+        results[spec["name"]] = {
+            "status": status,
+            "seconds": time.perf_counter() - start,
+            "max_rss_kb": resources["max_rss_kb"],
+            "cpu_seconds": resources["cpu_seconds"],
+        }
+        if status != "SUCCESS":
+            results[spec["name"]]["error"] = error.strip().splitlines()[-5:]
+            break
+    load_test = tier_dir / "load_test.json"
+    if results.get("api", {}).get("status") == "SUCCESS" and load_test.exists():
+        load = json.loads(load_test.read_text())
+        results["api"].update(
+            throughput_rps=load["throughput_rps"],
+            p99_ms=load["latency_ms"]["p99"],
+            error_rate=load["error_rate"],
+        )
+        if load["error_rate"] > 0:
+            results["api"]["status"] = "FAILED"
+            results["api"]["error"] = [f"{load['error_rate']:.1%} of requests failed"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline on synthetic data")
+    parser.add_argument("--tiers", nargs="+", choices=list(SCALE_TIERS), default=["1x"])
+    parser.add_argument("--workdir", default="data/synthetic")
+    parser.add_argument("--output", help="Save results as JSON")
+    args = parser.parse_args()
+
+    results = {"timestamp": datetime.now().isoformat(), "tiers": {}}
+    for tier in args.tiers:
+        regions, years = SCALE_TIERS[tier]
+        print(f"Tier {tier}: {regions} regions, {years} years")
+        stages = run_tier(Path(args.workdir) / tier, regions, years)
+        results["tiers"][tier] = {"regions": regions, "years": years, "stages": stages}
+
+    print(
+        f"\n{'tier':12s} {'stage':14s} {'status':8s} {'seconds':>9s} {'max RSS':>10s}"
+    )
+    for tier, result in results["tiers"].items():
+        for name, stage in result["stages"].items():
+            print(
+                f"{tier:12s} {name:14s} {stage['status']:8s} "
+                f"{stage['seconds']:9.1f} {stage['max_rss_kb'] / 1024:8.0f}MB"
+            )
+            if "throughput_rps" in stage:
+                print(
+                    f"{'':12s} {'':14s} {stage['throughput_rps']:.0f} req/s, "
+                    f"p99 {stage['p99_ms']:.1f} ms"
+                )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if any(
+        stage["status"] != "SUCCESS"
+        for result in results["tiers"].values()
+        for stage in result["stages"].values()
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
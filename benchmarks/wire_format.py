@@ -0,0 +1,140 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment import api
+from deployment.wire_format import (
+    ARROW_CONTENT_TYPE,
+    RAW_CONTENT_TYPE,
+    decode_arrow,
+    decode_raw,
+    encode_arrow,
+    encode_raw,
+)
+from experiments.config import FEATURE_COLUMNS, XGBOOST_PARAMS
+
+
+def synthetic_features(rows, seed=42):
+    """Encoded feature matrix with realistic value ranges"""
+    rng = np.random.default_rng(seed)
+    lags = rng.normal(300, 80, size=(rows, 6))
+    month = rng.integers(1, 13, rows)
+    day_of_week = rng.integers(0, 7, rows)
+    return pd.DataFrame(
+        np.column_stack(
+            [
+                rng.integers(0, 24, rows),
+                day_of_week,
+                month,
+                (month - 1) // 3 + 1,
+                day_of_week >= 5,
+                lags,
+                rng.integers(0, 13, rows),
+                rng.integers(0, 2, rows),
+            ]
+        ),
+        columns=FEATURE_COLUMNS,
+    )
+
+
+def synthetic_model(seed=42):
+    """Small XGBoost model trained on synthetic features"""
+    import xgboost as xgb
+
+    X = synthetic_features(5000, seed)
+    y = X["value_lag_1"] + np.random.default_rng(seed).normal(0, 10, len(X))
+    return xgb.XGBRegressor(**XGBOOST_PARAMS).fit(X, y)
+
+
+def benchmark_json(client, features):
+    """One /predict call per row"""
+    states = {code: state for state, code in api.STATE_ENCODING.items()}
+    types = {code: t for t, code in api.TYPE_ENCODING.items()}
+    payloads = [
+        {
+            **{c: float(row[c]) for c in FEATURE_COLUMNS[5:11]},
+            "hour": int(row["hour"]),
+            "day_of_week": int(row["day_of_week"]),
+            "month": int(row["month"]),
+            "quarter": int(row["quarter"]),
+            "is_weekend": bool(row["is_weekend"]),
+            "state": states[int(row["state_encoded"])],
+            "intensity_type": types[int(row["type_encoded"])],
+        }
+        for _, row in features.iterrows()
+    ]
+
+    start = time.perf_counter()
+    for payload in payloads:
+        client.post("/predict", json=payload).raise_for_status()
+    return time.perf_counter() - start
+
+
+def benchmark_binary(client, features, content_type, encode, decode, batch_size):
+    """/predict/batch calls of batch_size rows, including client-side encoding"""
+    matrix = features.to_numpy(dtype=np.float32)
+
+    start = time.perf_counter()
+    for i in range(0, len(matrix), batch_size):
+        response = client.post(
+            "/predict/batch",
+            content=encode(FEATURE_COLUMNS, matrix[i : i + batch_size]),
+            headers={"content-type": content_type},
+        )
+        response.raise_for_status()
+        decode(response.content)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--output", default=None, help="Save results as JSON")
+    args = parser.parse_args()
+
+    api.set_model(synthetic_model(), "benchmark")
+    client = TestClient(api.app)
+    features = synthetic_features(args.rows, seed=7)
+
+    timings = {
+        "json": benchmark_json(client, features),
+        "raw": benchmark_binary(
+            client, features, RAW_CONTENT_TYPE, encode_raw, decode_raw, args.batch_size
+        ),
+        "arrow": benchmark_binary(
+            client,
+            features,
+            ARROW_CONTENT_TYPE,
+            encode_arrow,
+            decode_arrow,
+            args.batch_size,
+        ),
+    }
+
+    results = {
+        name: {"seconds": seconds, "rows_per_second": args.rows / seconds}
+        for name, seconds in timings.items()
+    }
+    print(f"{'format':<8}{'seconds':>10}{'rows/s':>14}{'speedup':>10}")
+    for name, result in results.items():
+        speedup = timings["json"] / result["seconds"]
+        print(
+            f"{name:<8}{result['seconds']:>10.3f}"
+            f"{result['rows_per_second']:>14.0f}{speedup:>9.1f}x"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
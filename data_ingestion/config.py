@@ -25,3 +25,6 @@ DEFAULT_END_DATE = "2025-07-27"
 
 BATCH_DAYS = 30
 DATA_DIR = Path("data/raw")
+
+# Written by data_processing/validate_raw.py, read by fetch_intensity.py --gaps
+GAP_INDEX_PATH = Path("data/quality/gap_index.json")
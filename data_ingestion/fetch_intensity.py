@@ -1,4 +1,5 @@
 import argparse
+import json
 import sys
 import time
 from datetime import datetime, timedelta
@@ -7,19 +8,22 @@ from urllib.parse import urljoin
 
 import pandas as pd
 import requests
-from config import (
+from tqdm import tqdm
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.config import (
     BASE_URL,
     BATCH_DAYS,
     CONSUMPTION_INTENSITY,
     DATA_DIR,
     DEFAULT_END_DATE,
     DEFAULT_START_DATE,
+    GAP_INDEX_PATH,
     PRODUCTION_INTENSITY,
     STATE_CODES,
 )
-from tqdm import tqdm
-
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+from data_processing.validate_raw import gap_batches
 
 
 def fetch_batch(
@@ -112,6 +116,7 @@ def fetch_and_save(
     start_dt = datetime.strptime(start_date_str, "%Y-%m-%d")
     end_dt = datetime.strptime(end_date_str, "%Y-%m-%d")
 
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
     for state in STATE_CODES:
         print(f"\nFetching {filename_suffix} data for {state}...")
         file_path = DATA_DIR / f"{state}_{filename_suffix}_intensity.csv"
@@ -150,6 +155,30 @@ def fetch_and_save(
             print(f"No new data for {state}.")
 
 
+def refetch_gaps(url: str, key: str, filename_suffix: str, gap_index: dict):
+    """Request only the days around missing hours listed in the gap index"""
+    for state, types in gap_index["series"].items():
+        spans = types.get(filename_suffix)
+        if not spans:
+            continue
+        batches = gap_batches(spans)
+        print(f"\nRefetching {len(spans)} gaps for {state} in {len(batches)} requests")
+        file_path = DATA_DIR / f"{state}_{filename_suffix}_intensity.csv"
+        fetched_rows = []
+        for batch_start, batch_end in batches:
+            fetched_rows.extend(fetch_batch(url, state, batch_start, batch_end, key))
+
+        if fetched_rows:
+            new_df = pd.DataFrame(fetched_rows, columns=["timestamp", "value"])
+            new_df["timestamp"] = pd.to_datetime(new_df["timestamp"])
+            # Existing rows win, so only the missing hours are filled in
+            combined_df = pd.concat([load_existing_csv(file_path), new_df])
+            combined_df.drop_duplicates(subset=["timestamp"], inplace=True)
+            combined_df.sort_values(by="timestamp", inplace=True)
+            combined_df.to_csv(file_path, index=False)
+            print(f"Saved {len(combined_df)} total records to {file_path}")
+
+
 if __name__ == "__main__":
 
     consumption_url = urljoin(BASE_URL, CONSUMPTION_INTENSITY)
@@ -164,8 +193,33 @@ if __name__ == "__main__":
         default="both",
         help="Which intensity data to fetch",
     )
+    parser.add_argument(
+        "--gaps",
+        nargs="?",
+        const=str(GAP_INDEX_PATH),
+        help="Refetch only the missing hours in this gap index "
+        "(written by data_processing/validate_raw.py)",
+    )
     args = parser.parse_args()
 
+    if args.gaps:
+        gap_index = json.loads(Path(args.gaps).read_text())
+        if args.mode in ("consumption", "both"):
+            refetch_gaps(
+                consumption_url,
+                "Consumption-based Intensity (historical)",
+                "consumption",
+                gap_index,
+            )
+        if args.mode in ("production", "both"):
+            refetch_gaps(
+                production_url,
+                "Production-based Intensity (historical)",
+                "production",
+                gap_index,
+            )
+        sys.exit(0)
+
     if args.mode in ("consumption", "both"):
         fetch_and_save(
             consumption_url,
@@ -0,0 +1,88 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.config import STATE_CODES
+
+
+def region_codes(count):
+    """The real state codes first, then synthetic regions R014, R015, ..."""
+    extra = [f"R{i:03d}" for i in range(len(STATE_CODES) + 1, count + 1)]
+    return (STATE_CODES + extra)[:count]
+
+
+def synthetic_series(
+    rng, start, hours, base, solar=False, gap_rate=0.001, duplicate_rate=0.001
+):
+    """One hourly intensity series as fetch_intensity stores it
+
+    Daily and weekly seasonality (evening peak, weekend dip, midday solar
+    dip for production) plus a yearly cycle and autocorrelated noise. Spans
+    of hours are missing and some timestamps appear twice.
+    """
+    timestamps = pd.date_range(start, periods=hours, freq="h")
+    hour = timestamps.hour.to_numpy()
+    day_of_year = timestamps.dayofyear.to_numpy()
+    daily = 0.12 * np.cos(2 * np.pi * (hour - 19) / 24)
+    if solar:
+        daily -= 0.25 * np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None)
+    weekly = -0.08 * (timestamps.dayofweek.to_numpy() >= 5)
+    yearly = 0.15 * np.cos(2 * np.pi * day_of_year / 365.25)
+    noise = np.convolve(rng.normal(0, 0.06, hours + 11), np.ones(12) / 12**0.5, "valid")
+    values = np.clip(base * (1 + daily + weekly + yearly + noise), 0, None).round(1)
+
+    keep = np.ones(hours, dtype=bool)
+    for gap_start in np.flatnonzero(rng.random(hours) < gap_rate):
+        keep[gap_start : gap_start + rng.integers(1, 48)] = False
+    duplicated = np.flatnonzero(keep & (rng.random(hours) < duplicate_rate))
+    order = np.concatenate([np.flatnonzero(keep), duplicated])
+    order.sort(kind="stable")
+    return pd.DataFrame({"timestamp": timestamps[order], "value": values[order]})
+
+
+def write_synthetic_store(
+    data_dir, regions=13, years=1.0, start="2022-01-01", legacy_fraction=0.1, seed=42
+):
+    """Write consumption and production CSVs for `regions` regions
+
+    Files follow the raw-store layout ({region}_{type}_intensity.csv); a
+    share of them use the legacy "0","1" header. Returns the region codes.
+    """
+    rng = np.random.default_rng(seed)
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    hours = int(years * 8760)
+    codes = region_codes(regions)
+    for code in codes:
+        base = rng.uniform(150, 600)
+        for intensity_type in ["consumption", "production"]:
+            df = synthetic_series(
+                rng, start, hours, base, solar=intensity_type == "production"
+            )
+            legacy = rng.random() < legacy_fraction
+            df.to_csv(
+                data_dir / f"{code}_{intensity_type}_intensity.csv",
+                index=False,
+                header=["0", "1"] if legacy else True,
+            )
+    return codes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic raw data store")
+    parser.add_argument("--output", default="data/synthetic/raw")
+    parser.add_argument("--regions", type=int, default=13)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--start", default="2022-01-01")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    codes = write_synthetic_store(
+        args.output, args.regions, args.years, args.start, seed=args.seed
+    )
+    print(f"Wrote {2 * len(codes)} series of {args.years} years to {args.output}")
@@ -10,7 +10,14 @@ sys.path.append(str(Path(__file__).parent.parent))
 from data_ingestion.config import DATA_DIR, STATE_CODES
 
 
-def load_and_combine_data(states=None):
+def available_states(data_dir=DATA_DIR):
+    """State or region codes that have raw files in data_dir"""
+    return sorted(
+        {p.name.split("_")[0] for p in Path(data_dir).glob("*_intensity.csv")}
+    )
+
+
+def load_and_combine_data(states=None, data_dir=DATA_DIR):
     """Load and combine consumption/production data from multiple states"""
     if states is None:
         states = STATE_CODES
@@ -18,8 +25,8 @@ def load_and_combine_data(states=None):
     all_data = []
 
     for state in states:
-        consumption_file = DATA_DIR / f"{state}_consumption_intensity.csv"
-        production_file = DATA_DIR / f"{state}_production_intensity.csv"
+        consumption_file = Path(data_dir) / f"{state}_consumption_intensity.csv"
+        production_file = Path(data_dir) / f"{state}_production_intensity.csv"
 
         if consumption_file.exists():
             df_cons = pd.read_csv(consumption_file)
@@ -67,10 +74,12 @@ def create_lag_features(df, target_col="value", lags=[1, 2, 3, 24, 48, 168]):
     return df
 
 
-def prepare_ml_dataset(output_path="data/processed/ml_dataset.csv"):
+def prepare_ml_dataset(
+    output_path="data/processed/ml_dataset.csv", data_dir=DATA_DIR, states=None
+):
     """Main pipeline to prepare ML-ready dataset"""
     print("Loading raw data...")
-    df = load_and_combine_data()
+    df = load_and_combine_data(states, data_dir)
 
     print("Creating time features...")
     df = create_time_features(df)
@@ -95,6 +104,13 @@ def prepare_ml_dataset(output_path="data/processed/ml_dataset.csv"):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--output", default="data/processed/ml_dataset.csv")
+    parser.add_argument(
+        "--data-dir", default=None, help="Raw data directory (all regions in it)"
+    )
     args = parser.parse_args()
 
-    prepare_ml_dataset(args.output)
+    if args.data_dir is None:
+        prepare_ml_dataset(args.output)
+    else:
+        states = available_states(args.data_dir)
+        prepare_ml_dataset(args.output, args.data_dir, states)
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.config import BATCH_DAYS, DATA_DIR, GAP_INDEX_PATH
+from data_processing.prepare_features import available_states, load_and_combine_data
+
+RAW_TIMEZONE = "Europe/Berlin"  # Wall-clock zone of the raw timestamps
+VALUE_RANGE = (0.0, 1500.0)  # Plausible gCO2/kWh
+SPIKE_THRESHOLD = 10.0  # Robust z-score of a value against its two neighbours
+MAX_LISTED = 20  # Example hours listed per issue in the report
+
+
+def dst_hours(first, last, timezone=RAW_TIMEZONE):
+    """Wall-clock hours skipped and repeated by DST changes between first and last
+
+    Returns (missing, repeated) as datetime64[h] arrays: a series recorded in
+    local time has no spring-forward hour and the fall-back hour twice.
+    """
+    utc = pd.date_range(
+        pd.Timestamp(first) - pd.Timedelta(days=1),
+        pd.Timestamp(last) + pd.Timedelta(days=1),
+        freq="h",
+        tz="UTC",
+    )
+    local = utc.tz_convert(timezone).tz_localize(None).to_numpy()
+    local = local.astype("datetime64[h]")
+    step = np.diff(local).astype(np.int64)
+    return local[:-1][step == 2] + 1, local[1:][step == 0]
+
+
+def scan_series(hours, values, dst_missing, dst_repeated, expected=None):
+    """Quality issues of one series in a single vectorized pass
+
+    hours (datetime64[h]) and values are in file order. Gaps are runs of
+    missing hours, except single hours skipped by the spring DST change;
+    with an expected (first, last) hour range, hours missing before the
+    first row and after the last one are gaps too. Duplicates are repeated
+    hours, except the fall-back hour. Outliers are values outside
+    VALUE_RANGE and spikes far from both neighbours.
+    """
+    step = np.diff(hours).astype(np.int64)
+    unordered = int((step < 0).sum())
+    if unordered:
+        order = np.argsort(hours, kind="stable")
+        hours, values = hours[order], values[order]
+        step = np.diff(hours).astype(np.int64)
+
+    repeated = step == 0
+    repeated_hours = hours[1:][repeated]
+    conflicting = values[1:][repeated] != values[:-1][repeated]
+    dst_repeat = np.isin(repeated_hours, dst_repeated)
+
+    after = np.flatnonzero(step > 1)
+    gap_start, gap_end = hours[after] + 1, hours[after + 1] - 1
+    if expected is not None:
+        first, last = (np.datetime64(hour, "h") for hour in expected)
+        if first < hours[0]:
+            gap_start = np.concatenate([[first], gap_start])
+            gap_end = np.concatenate([[hours[0] - 1], gap_end])
+        if hours[-1] < last:
+            gap_start = np.concatenate([gap_start, [hours[-1] + 1]])
+            gap_end = np.concatenate([gap_end, [last]])
+    dst_gap = (gap_start == gap_end) & np.isin(gap_start, dst_missing)
+
+    out_of_range = ~((values >= VALUE_RANGE[0]) & (values <= VALUE_RANGE[1]))
+    spikes = np.zeros(len(values), dtype=bool)
+    if len(values) > 2:
+        # Judge hours whose neighbours are the adjacent, in-range hours. A
+        # spike also lifts its neighbours' residuals, so only peaks count.
+        valid = np.where(out_of_range, np.nan, values)
+        neighbours = (step[:-1] == 1) & (step[1:] == 1)
+        residual = valid[1:-1] - (valid[:-2] + valid[2:]) / 2
+        residual = np.where(neighbours, residual, np.nan)
+        if np.isfinite(residual).any():
+            deviation = np.abs(residual - np.nanmedian(residual))
+            mad = 1.4826 * np.nanmedian(deviation)
+            padded = np.pad(np.nan_to_num(deviation), 1)
+            peak = padded[1:-1] >= np.maximum(padded[:-2], padded[2:])
+            with np.errstate(invalid="ignore"):
+                spikes[1:-1] = peak & (deviation > SPIKE_THRESHOLD * max(mad, 1e-9))
+
+    def listed(array):
+        return [str(hour) for hour in array[:MAX_LISTED]]
+
+    gaps = list(zip(gap_start[~dst_gap], gap_end[~dst_gap]))
+    gap_hours = (gap_end - gap_start).astype(np.int64) + 1
+    return {
+        "rows": len(hours),
+        "first": str(hours[0]),
+        "last": str(hours[-1]),
+        "unordered": unordered,
+        "gaps": [[str(start), str(end)] for start, end in gaps],
+        "missing_hours": int(gap_hours[~dst_gap].sum()),
+        "duplicates": int((~dst_repeat).sum()),
+        "conflicting_duplicates": int((conflicting & ~dst_repeat).sum()),
+        "duplicate_hours": listed(repeated_hours[~dst_repeat]),
+        "dst_missing": listed(gap_start[dst_gap]),
+        "dst_repeated": listed(repeated_hours[dst_repeat]),
+        "out_of_range": int(out_of_range.sum()),
+        "spikes": int(spikes.sum()),
+        "outlier_hours": listed(hours[out_of_range | spikes]),
+    }
+
+
+def validate_raw(data_dir=DATA_DIR, states=None, start=None, end=None):
+    """Scan every (state, type) series; returns {state: {type: issues}}
+
+    Every series is expected to cover start to end (dates, inclusive),
+    by default the span of all series together, so a series that starts
+    late or stops early has gaps at its edges.
+    """
+    if states is None:
+        states = available_states(data_dir)
+    df = load_and_combine_data(states, data_dir)
+    hours = df["timestamp"].to_numpy().astype("datetime64[h]")
+    values = pd.to_numeric(df["value"], errors="coerce").to_numpy(np.float64)
+    first, last = hours.min(), hours.max()
+    if start is not None:
+        first = np.datetime64(start, "D").astype("datetime64[h]")
+    if end is not None:
+        last = np.datetime64(end, "D").astype("datetime64[h]") + 23
+    dst_missing, dst_repeated = dst_hours(
+        min(first, hours.min()), max(last, hours.max())
+    )
+
+    report = {}
+    # Group positions keep file order, so unordered rows are still visible
+    for (state, intensity_type), index in df.groupby(["state", "type"]).indices.items():
+        report.setdefault(state, {})[intensity_type] = scan_series(
+            hours[index], values[index], dst_missing, dst_repeated, (first, last)
+        )
+    return report
+
+
+def gap_index(report):
+    """Missing hour ranges per state and type, for fetch_intensity.py --gaps"""
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "timezone": RAW_TIMEZONE,
+        "series": {
+            state: {t: issues["gaps"] for t, issues in types.items() if issues["gaps"]}
+            for state, types in report.items()
+            if any(issues["gaps"] for issues in types.values())
+        },
+    }
+
+
+def gap_batches(spans, batch_days=BATCH_DAYS):
+    """Date ranges covering the given hour spans, at most batch_days long
+
+    The API is queried by date, so spans are widened to whole days; days
+    that are adjacent or shared by several spans are requested once.
+    Returns [(start, end)] as YYYY-MM-DD strings.
+    """
+    if not spans:
+        return []
+    days = np.unique(
+        np.concatenate(
+            [
+                np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+                for start, end in spans
+            ]
+        )
+    )
+    batches = []
+    run_start = days[0]
+    for previous, day in zip(days[:-1], days[1:]):
+        if day - previous > 1 or day - run_start >= batch_days:
+            batches.append((run_start, previous))
+            run_start = day
+    batches.append((run_start, days[-1]))
+    return [(str(start), str(end)) for start, end in batches]
+
+
+def save_json(data, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2))
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan raw data for quality issues")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--report", default=str(GAP_INDEX_PATH.parent / "report.json"))
+    parser.add_argument("--gap-index", default=str(GAP_INDEX_PATH))
+    parser.add_argument(
+        "--start", help="First date every series should cover (default: earliest)"
+    )
+    parser.add_argument(
+        "--end", help="Last date every series should cover (default: latest)"
+    )
+    args = parser.parse_args()
+
+    report = validate_raw(args.data_dir, start=args.start, end=args.end)
+    save_json(report, args.report)
+    index = gap_index(report)
+    save_json(index, args.gap_index)
+
+    columns = ["missing_hours", "duplicates", "unordered", "out_of_range", "spikes"]
+    print(f"{'series':18s} " + " ".join(f"{c:>14s}" for c in columns))
+    for state, types in report.items():
+        for intensity_type, issues in types.items():
+            counts = " ".join(f"{issues[c]:14d}" for c in columns)
+            print(f"{state + ' ' + intensity_type:18s} {counts}")
+    spans = sum(len(s) for types in index["series"].values() for s in types.values())
+    print(f"Report: {args.report}")
+    print(f"Gap index ({spans} missing ranges): {args.gap_index}")
@@ -1,21 +1,124 @@
+import asyncio
+import os
+import sys
+import time
 from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 
-import mlflow
-import mlflow.xgboost
 import pandas as pd
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.cache import PredictionCache
+from deployment.config import (
+    METRICS_ENABLED,
+    MODEL_NAME,
+    MODEL_POLL_SECONDS,
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_TTL_SECONDS,
+    PREDICTION_LOG_BUFFER_SIZE,
+    PREDICTION_LOG_DIR,
+    PREDICTION_LOG_ENABLED,
+    PREDICTION_LOG_FLUSH_SECONDS,
+    PREDICTION_LOG_POLICY,
+    PREDICTION_LOG_ROTATE_BYTES,
+    PREDICTION_LOG_ROTATE_SECONDS,
+    SHADOW_BATCH_ROWS,
+    SHADOW_FLUSH_SECONDS,
+    SHADOW_QUEUE_ROWS,
+    SHADOW_VERSIONS,
+    STATE_ENCODING,
+    TYPE_ENCODING,
+)
+from deployment.forecast_table import get_forecast_table
+from deployment.metrics import (
+    BATCH_BUCKETS,
+    Metrics,
+    MetricsMiddleware,
+    current_timer,
+)
+from deployment.model_bundle import load_bundle, read_bundle_metadata
+from deployment.prediction_logger import PredictionLogger
+from deployment.shadow import ShadowEvaluator
+from deployment.wire_format import (
+    ARROW_CONTENT_TYPE,
+    RAW_CONTENT_TYPE,
+    decode_arrow,
+    decode_raw,
+    encode_arrow,
+    encode_raw,
+)
+from experiments.config import FEATURE_COLUMNS
+
 app = FastAPI(
     title="CO₂ Intensity Forecast API",
     description="Predict German electricity CO₂ intensity using XGBoost",
     version="1.0.0",
 )
 
-# Global model variable
+# Global model variables
 model = None
+model_version = None
+# Encodings of the serving model: read-only, replaced whole on every swap
+STATE_ENCODING = MappingProxyType(dict(STATE_ENCODING))
+TYPE_ENCODING = MappingProxyType(dict(TYPE_ENCODING))
+attempted_version = None  # Newest version seen by the last load attempt
+reload_task = None
+shadow_task = None
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_SECONDS)
+prediction_logger = None
+if PREDICTION_LOG_ENABLED:
+    prediction_logger = PredictionLogger(
+        PREDICTION_LOG_DIR,
+        PREDICTION_LOG_BUFFER_SIZE,
+        PREDICTION_LOG_POLICY,
+        PREDICTION_LOG_FLUSH_SECONDS,
+        PREDICTION_LOG_ROTATE_BYTES,
+        PREDICTION_LOG_ROTATE_SECONDS,
+    )
+
+shadow_evaluator = None
+if SHADOW_VERSIONS:
+    shadow_evaluator = ShadowEvaluator(
+        SHADOW_QUEUE_ROWS, SHADOW_BATCH_ROWS, SHADOW_FLUSH_SECONDS
+    )
+
+metrics = Metrics()
+metrics.gauge("prediction_cache_entries", lambda: len(prediction_cache.entries))
+if prediction_logger is not None:
+    metrics.gauge("prediction_log_buffered", lambda: prediction_logger.buffered_rows)
+    metrics.gauge("prediction_log_dropped", lambda: prediction_logger.dropped)
+
+
+def shadow_stat(version, key):
+    """A shadow version's divergence statistic, 0 until it has compared any"""
+    stats = shadow_evaluator.stats()["versions"].get(version, {})
+    return stats.get(key) or 0
+
+
+if shadow_evaluator is not None:
+    metrics.gauge("shadow_queued_rows", lambda: shadow_evaluator.queued_rows)
+    metrics.gauge("shadow_dropped", lambda: shadow_evaluator.dropped)
+    # Registered up front: shadow models load in the background later
+    for shadow_version in SHADOW_VERSIONS:
+        for gauge_name, key in [
+            ("shadow_predictions", "count"),
+            ("shadow_mean_abs_diff", "mean_abs_diff"),
+            ("shadow_max_abs_diff", "max_abs_diff"),
+        ]:
+            metrics.gauge(
+                gauge_name,
+                lambda v=shadow_version, k=key: shadow_stat(v, k),
+                (("version", shadow_version),),
+            )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 
 class PredictionRequest(BaseModel):
@@ -32,6 +135,7 @@ class PredictionRequest(BaseModel):
     value_lag_24: float = 140.0
     value_lag_48: float = 135.0
     value_lag_168: float = 142.0
+    target_time: Optional[datetime] = None  # Answered from the forecast table
 
 
 class PredictionResponse(BaseModel):
@@ -40,55 +144,179 @@ class PredictionResponse(BaseModel):
     state: str
     intensity_type: str
     timestamp: str
+    source: str = "model"  # model or forecast_table
+
+
+def process_started_at():
+    """Wall-clock start of this process (Linux), else the API import time"""
+    try:
+        stat = Path("/proc/self/stat").read_text().rsplit(")", 1)[1].split()
+        with open("/proc/stat") as f:
+            boot = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot + int(stat[19]) / os.sysconf("SC_CLK_TCK")
+    except OSError:
+        return time.time()
+
+
+# Cold start timing, reported on /health
+startup_timing = {
+    "process_started_at": process_started_at(),
+    "model_load_seconds": None,
+    "first_prediction_seconds": None,
+}
+
+
+def set_model(new_model, version, encodings=None):
+    """Serve a new model; cached predictions of the old one are dropped
+
+    New encodings replace the mappings instead of changing them in place, so
+    a request holding the old ones still sees a complete, consistent mapping.
+    """
+    global model, model_version, STATE_ENCODING, TYPE_ENCODING
+    if encodings is not None:
+        STATE_ENCODING = MappingProxyType(dict(encodings["state_encoding"]))
+        TYPE_ENCODING = MappingProxyType(dict(encodings["type_encoding"]))
+    model, model_version = new_model, version
+    prediction_cache.clear()
+
+
+def latest_registry_version():
+    """Newest registered version of the model"""
+    import mlflow
+
+    client = mlflow.tracking.MlflowClient()
+    versions = client.search_model_versions(f"name='{MODEL_NAME}'")
+    return str(max(int(v.version) for v in versions))
+
+
+def latest_version():
+    """Version to serve: the exported bundle if there is one, else the registry
+
+    The bundle takes precedence: once one is exported the registry is not
+    consulted, so new registry versions are served by exporting them.
+    """
+    meta = read_bundle_metadata()
+    if meta is not None:
+        return meta["model_version"]
+    return latest_registry_version()
+
+
+def load_version(version):
+    """Load a model version and warm it up with one prediction
+
+    The local bundle only needs xgboost; MLflow is imported only when the
+    model has to come from the registry.
+    """
+    meta = read_bundle_metadata()
+    if meta is not None and meta["model_version"] == version:
+        # The bundle may have been re-exported since; trust what was loaded
+        new_model, meta = load_bundle()
+        version = meta["model_version"]
+        if meta["feature_order"] != FEATURE_COLUMNS:
+            raise ValueError(
+                f"Bundle version {version} expects features "
+                f"{meta['feature_order']}, not {FEATURE_COLUMNS}"
+            )
+    else:
+        import mlflow.xgboost
+
+        new_model = mlflow.xgboost.load_model(f"models:/{MODEL_NAME}/{version}")
+        meta = None
+
+    warmup = pd.DataFrame([[0] * len(FEATURE_COLUMNS)], columns=FEATURE_COLUMNS)
+    new_model.predict(warmup)
+    return new_model, version, meta
+
+
+def load_latest_run():
+    """Fallback: newest run in the local mlruns directory"""
+    import mlflow.xgboost
+
+    runs = [p for p in Path("mlruns/1").glob("*") if (p / "artifacts/model").exists()]
+    latest_run = max(runs, key=lambda p: p.stat().st_mtime)
+    new_model = mlflow.xgboost.load_model(str(latest_run / "artifacts/model"))
+    return new_model, f"run:{latest_run.name}"
+
+
+def load_shadow_models():
+    """Load the SHADOW_VERSIONS models; failed versions are skipped"""
+    for version in SHADOW_VERSIONS:
+        try:
+            shadow_model = load_version(version)[0]
+        except Exception as e:
+            print(f"Failed to load shadow version {version}: {e}")
+            continue
+        shadow_evaluator.add_model(version, shadow_model)
+        print(f"Shadow version {version} loaded")
+
+
+async def poll_model_updates():
+    """Swap in newly exported or registered versions without restarting the API
+
+    Loading and warming run in a worker thread; the swap itself happens on
+    the event loop between requests, so in-flight requests finish on the
+    model they started with.
+    """
+    while True:
+        await asyncio.sleep(MODEL_POLL_SECONDS)
+        await reload_if_updated()
+
+
+async def reload_if_updated():
+    """Load the newest version if it changed since the last attempt
+
+    Compared with the last version attempted rather than the one serving, so
+    a fallback model or a version that failed to load is not reloaded on
+    every poll; the old model keeps serving until a newer version appears.
+    """
+    global attempted_version
+    try:
+        version = await asyncio.to_thread(latest_version)
+        if version == attempted_version:
+            return
+        attempted_version = version
+        set_model(*await asyncio.to_thread(load_version, version))
+        print(f"Model version {version} now serving")
+    except Exception as e:
+        print(f"Model reload failed: {e}")
 
 
 @app.on_event("startup")
 async def load_model():
-    """Load model from MLflow registry on startup"""
-    global model
+    """Load model from the local bundle or MLflow registry on startup"""
+    global attempted_version, reload_task, shadow_task
+    if prediction_logger is not None:
+        prediction_logger.start()
+    if shadow_evaluator is not None:
+        # Shadow models load in the background so they don't delay serving
+        shadow_evaluator.start()
+        shadow_task = asyncio.create_task(asyncio.to_thread(load_shadow_models))
+    if MODEL_POLL_SECONDS > 0:
+        reload_task = asyncio.create_task(poll_model_updates())
+    load_started = time.perf_counter()
     try:
-        model_uri = "models:/co2-intensity-xgboost/latest"
-        model = mlflow.xgboost.load_model(model_uri)
-        print("Model loaded successfully from MLflow registry")
+        attempted_version = latest_version()
+        set_model(*load_version(attempted_version))
+        print(f"Model version {model_version} loaded")
     except Exception as e:
         print(f"Failed to load model: {e}")
         # Fallback: try loading from local mlruns
         try:
-            import os
-
-            runs_dir = "mlruns/1"  # Experiment 1
-            if os.path.exists(runs_dir):
-                run_dirs = [
-                    d
-                    for d in os.listdir(runs_dir)
-                    if os.path.isdir(os.path.join(runs_dir, d))
-                ]
-                if run_dirs:
-                    latest_run = sorted(run_dirs)[-1]
-                    model_path = f"mlruns/1/{latest_run}/artifacts/model"
-                    model = mlflow.xgboost.load_model(model_path)
-                    print("Model loaded from local mlruns")
+            set_model(*load_latest_run())
+            print("Model loaded from local mlruns")
         except Exception as fallback_e:
             print(f"Fallback load failed: {fallback_e}")
+    startup_timing["model_load_seconds"] = time.perf_counter() - load_started
 
 
-# State and type encoding mappings (from training)
-STATE_ENCODING = {
-    "BW": 0,
-    "BY": 1,
-    "BB": 2,
-    "HE": 3,
-    "MV": 4,
-    "NI": 5,
-    "NW": 6,
-    "RP": 7,
-    "SL": 8,
-    "SN": 9,
-    "ST": 10,
-    "SH": 11,
-    "TH": 12,
-}
-TYPE_ENCODING = {"consumption": 0, "production": 1}
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    if reload_task is not None:
+        reload_task.cancel()
+    if prediction_logger is not None:
+        await asyncio.to_thread(prediction_logger.close)
+    if shadow_evaluator is not None:
+        await asyncio.to_thread(shadow_evaluator.close)
 
 
 @app.get("/")
@@ -101,6 +329,11 @@ async def health_check():
     return {
         "status": "healthy",
         "model_loaded": model is not None,
+        "model_version": model_version,
+        "prediction_cache": prediction_cache.stats(),
+        "startup": startup_timing,
+        "prediction_log": prediction_logger and prediction_logger.stats(),
+        "shadow": shadow_evaluator and shadow_evaluator.stats(),
         "timestamp": datetime.now().isoformat(),
     }
 
@@ -108,49 +341,185 @@ async def health_check():
 @app.post("/predict", response_model=PredictionResponse)
 async def predict(request: PredictionRequest):
     """Make CO₂ intensity prediction"""
-    if model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    timer = current_timer.get()
+    if timer is not None:
+        timer.mark("validate")
 
-    # Validate inputs
-    if request.state not in STATE_ENCODING:
+    # Validate inputs against the encodings of the serving model
+    state_encoding, type_encoding = STATE_ENCODING, TYPE_ENCODING
+    if request.state not in state_encoding:
         raise HTTPException(status_code=400, detail=f"Invalid state: {request.state}")
-    if request.intensity_type not in TYPE_ENCODING:
+    if request.intensity_type not in type_encoding:
         raise HTTPException(
             status_code=400, detail=f"Invalid type: {request.intensity_type}"
         )
     if not (0 <= request.hour <= 23):
         raise HTTPException(status_code=400, detail="Hour must be 0-23")
 
-    # Prepare features in training order
-    features = pd.DataFrame(
-        {
-            "hour": [request.hour],
-            "day_of_week": [request.day_of_week],
-            "month": [request.month],
-            "quarter": [request.quarter],
-            "is_weekend": [int(request.is_weekend)],
-            "value_lag_1": [request.value_lag_1],
-            "value_lag_2": [request.value_lag_2],
-            "value_lag_3": [request.value_lag_3],
-            "value_lag_24": [request.value_lag_24],
-            "value_lag_48": [request.value_lag_48],
-            "value_lag_168": [request.value_lag_168],
-            "state_encoded": [STATE_ENCODING[request.state]],
-            "type_encoded": [TYPE_ENCODING[request.intensity_type]],
-        }
+    # Answer precomputed forecasts without running the model
+    if request.target_time is not None:
+        table = get_forecast_table()
+        value = table and table.lookup(
+            request.state, request.intensity_type, request.target_time
+        )
+        if value is not None:
+            if prediction_logger is not None:
+                prediction_logger.log_prediction(
+                    request.state,
+                    request.intensity_type,
+                    None,
+                    value,
+                    f"forecast_table:{table.version}",
+                    request.target_time,
+                )
+            return PredictionResponse(
+                prediction=value,
+                state=request.state,
+                intensity_type=request.intensity_type,
+                timestamp=datetime.now().isoformat(),
+                source="forecast_table",
+            )
+
+    # Pin the serving model so a concurrent reload cannot switch it mid-request
+    current_model, current_version = model, model_version
+    if current_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if timer is not None:
+        timer.model_version = current_version
+
+    # Encode features in training order
+    features = (
+        request.hour,
+        request.day_of_week,
+        request.month,
+        request.quarter,
+        int(request.is_weekend),
+        request.value_lag_1,
+        request.value_lag_2,
+        request.value_lag_3,
+        request.value_lag_24,
+        request.value_lag_48,
+        request.value_lag_168,
+        state_encoding[request.state],
+        type_encoding[request.intensity_type],
     )
+    if timer is not None:
+        timer.mark("encode")
+
+    # Make prediction, reusing identical recent requests
+    prediction = prediction_cache.get(current_version, features)
+    if prediction is None:
+        frame = pd.DataFrame([features], columns=FEATURE_COLUMNS)
+        if timer is not None:
+            timer.mark("frame")
+        prediction = float(current_model.predict(frame)[0])
+        if timer is not None:
+            timer.mark("predict")
+        prediction_cache.put(current_version, features, prediction)
+    if shadow_evaluator is not None:
+        shadow_evaluator.submit(features, prediction, current_version)
+
+    if prediction_logger is not None:
+        prediction_logger.log_prediction(
+            request.state,
+            request.intensity_type,
+            features,
+            prediction,
+            current_version,
+            request.target_time,
+        )
 
-    # Make prediction
-    prediction = model.predict(features)[0]
+    if startup_timing["first_prediction_seconds"] is None:
+        elapsed = time.time() - startup_timing["process_started_at"]
+        startup_timing["first_prediction_seconds"] = elapsed
+        print(f"First prediction served {elapsed:.2f}s after process start")
 
     return PredictionResponse(
-        prediction=float(prediction),
+        prediction=prediction,
         state=request.state,
         intensity_type=request.intensity_type,
         timestamp=datetime.now().isoformat(),
     )
 
 
+@app.post("/predict/batch")
+async def predict_batch(request: Request):
+    """Predict encoded feature rows sent as Arrow IPC or a raw float32 matrix
+
+    Responds in the request's format with a single prediction column. Raw
+    matrices in training column order reach the model without being copied.
+    """
+    timer = current_timer.get()
+    if timer is not None:
+        timer.mark("receive")
+
+    # Parameters such as "; charset=binary" don't change the format
+    content_type = request.headers.get("content-type", RAW_CONTENT_TYPE)
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type == ARROW_CONTENT_TYPE:
+        decode, encode = decode_arrow, encode_arrow
+    elif content_type == RAW_CONTENT_TYPE:
+        decode, encode = decode_raw, encode_raw
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported: {content_type}")
+
+    try:
+        columns, matrix = decode(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    missing = set(FEATURE_COLUMNS) - set(columns)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing columns: {missing}")
+    if columns != FEATURE_COLUMNS:
+        matrix = matrix[:, [columns.index(c) for c in FEATURE_COLUMNS]]
+
+    current_model, current_version = model, model_version
+    if current_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if timer is not None:
+        timer.model_version = current_version
+        timer.mark("decode")
+        metrics.observe("batch_rows", (), len(matrix), BATCH_BUCKETS)
+
+    predictions = current_model.predict(matrix)
+    if timer is not None:
+        timer.mark("predict")
+    if prediction_logger is not None:
+        prediction_logger.log_batch(matrix, predictions, current_version)
+    if shadow_evaluator is not None:
+        shadow_evaluator.submit(matrix, predictions, current_version)
+    return Response(
+        encode(["prediction"], predictions.reshape(-1, 1)), media_type=content_type
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics: request and per-stage latency, batch sizes, queues"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return metrics.render()
+
+
+@app.get("/shadow")
+async def get_shadow():
+    """Divergence of each shadow version from the serving model"""
+    if shadow_evaluator is None:
+        raise HTTPException(status_code=404, detail="No shadow versions configured")
+    return {"serving_version": model_version, **shadow_evaluator.stats()}
+
+
+@app.get("/schema")
+async def get_schema():
+    """Feature order and encodings expected by /predict/batch"""
+    return {
+        "feature_columns": FEATURE_COLUMNS,
+        "state_encoding": dict(STATE_ENCODING),
+        "type_encoding": dict(TYPE_ENCODING),
+        "model_version": model_version,
+    }
+
+
 @app.get("/states")
 async def get_states():
     """Get available German states"""
@@ -0,0 +1,64 @@
+import os
+from pathlib import Path
+
+# Deployment configuration
+MODEL_NAME = "co2-intensity-xgboost"
+
+# State and type encoding mappings (from training, LabelEncoder codes are
+# assigned in sorted order). A model bundle overrides them with its own.
+STATE_ENCODING = {
+    "BW": 1,
+    "BY": 2,
+    "BB": 0,
+    "HE": 3,
+    "MV": 4,
+    "NI": 5,
+    "NW": 6,
+    "RP": 7,
+    "SL": 9,
+    "SN": 10,
+    "ST": 11,
+    "SH": 8,
+    "TH": 12,
+}
+TYPE_ENCODING = {"consumption": 0, "production": 1}
+
+# Self-contained model bundle produced by the deploy step
+MODEL_BUNDLE_DIR = Path(os.getenv("MODEL_BUNDLE_DIR", "models"))
+
+# Precomputed forecast table
+FORECAST_DIR = Path("data/forecasts")
+FORECAST_HORIZON_HOURS = 48
+FORECAST_REFRESH_SECONDS = 60  # How often the API checks for a new table
+FORECAST_KEEP_VERSIONS = 3
+FORECAST_MAX_STALE_HOURS = 2  # Series ending earlier than this are left out
+
+# Prediction cache
+PREDICTION_CACHE_SIZE = 10000
+PREDICTION_CACHE_TTL_SECONDS = 300
+
+# Prediction log for live accuracy monitoring (PREDICTION_LOG_ENABLED=0 disables)
+PREDICTION_LOG_ENABLED = os.getenv("PREDICTION_LOG_ENABLED", "1") == "1"
+PREDICTION_LOG_DIR = Path(os.getenv("PREDICTION_LOG_DIR", "logs/predictions"))
+PREDICTION_LOG_BUFFER_SIZE = 10000  # Rows: each row of a batch counts
+PREDICTION_LOG_POLICY = "drop_newest"  # or drop_oldest when the buffer is full
+PREDICTION_LOG_FLUSH_SECONDS = 1.0
+PREDICTION_LOG_ROTATE_BYTES = 64 * 1024 * 1024
+PREDICTION_LOG_ROTATE_SECONDS = 3600
+
+# Request metrics on /metrics (METRICS_ENABLED=0 removes all instrumentation)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Hot reload: how often the bundle or registry is checked for a new version
+# (0 disables)
+MODEL_POLL_SECONDS = int(os.getenv("MODEL_POLL_SECONDS", "60"))
+
+# Shadow serving: registry versions evaluated next to the serving model on the
+# same encoded features, off the request path (comma-separated, empty disables)
+SHADOW_VERSIONS = [v for v in os.getenv("SHADOW_VERSIONS", "").split(",") if v]
+# Pending rows; more are dropped, not waited for
+SHADOW_QUEUE_ROWS = int(os.getenv("SHADOW_QUEUE_ROWS", "10000"))
+# Rows predicted together by each shadow model
+SHADOW_BATCH_ROWS = int(os.getenv("SHADOW_BATCH_ROWS", "10000"))
+# Queued requests are evaluated together this often
+SHADOW_FLUSH_SECONDS = float(os.getenv("SHADOW_FLUSH_SECONDS", "0.1"))
@@ -0,0 +1,205 @@
+import argparse
+import calendar
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.config import (
+    FORECAST_DIR,
+    FORECAST_HORIZON_HOURS,
+    FORECAST_KEEP_VERSIONS,
+    FORECAST_MAX_STALE_HOURS,
+    FORECAST_REFRESH_SECONDS,
+    STATE_ENCODING,
+    TYPE_ENCODING,
+)
+from experiments.config import LAG_FEATURES
+from experiments.predict import recursive_forecast
+
+
+def epoch_hour(dt):
+    """Whole hours since 1970-01-01 (naive datetimes are taken as-is)"""
+    return calendar.timegm(dt.utctimetuple()) // 3600
+
+
+def latest_history(df, window=max(LAG_FEATURES)):
+    """Last `window` hourly values of every (state, type) series
+
+    All series are aligned on a shared hourly grid ending at the newest
+    timestamp, so the forecasts of every series start at the same hour.
+    Short gaps are filled with the previous value, but a series whose last
+    row is more than FORECAST_MAX_STALE_HOURS older than the grid's end is
+    left out, so its lookups fall back to the model instead of forecasting
+    from stale values.
+    """
+    df = df.copy()
+    if df["timestamp"].dt.tz is not None:
+        df["timestamp"] = df["timestamp"].dt.tz_convert(None)
+    end = df["timestamp"].max().floor("h")
+    grid = pd.date_range(end=end, periods=window, freq="h")
+
+    keys, history = [], []
+    for (state, intensity_type), series in df.groupby(["state", "type"]):
+        values = series.drop_duplicates("timestamp").set_index("timestamp")["value"]
+        if values.index.max() < end - pd.Timedelta(hours=FORECAST_MAX_STALE_HOURS):
+            continue
+        values = values.sort_index().reindex(grid, method="ffill")
+        if values.isna().any():
+            continue
+        keys.append((state, intensity_type))
+        history.append(values.to_numpy())
+
+    return keys, np.array(history), end + pd.Timedelta(hours=1)
+
+
+def build_forecast_table(
+    model, df, encodings, horizon=FORECAST_HORIZON_HOURS, forecast_dir=FORECAST_DIR
+):
+    """Forecast every (state, type, target hour) and publish it as a new table
+
+    encodings are the state_encoding and type_encoding the model was trained
+    with (a bundle's metadata has both).
+    """
+    state_encoding = encodings["state_encoding"]
+    type_encoding = encodings["type_encoding"]
+    df = df[df["state"].isin(state_encoding) & df["type"].isin(type_encoding)]
+    keys, history, base_time = latest_history(df)
+
+    forecasts = recursive_forecast(
+        model,
+        history,
+        np.full(len(keys), base_time.to_datetime64()),
+        horizon,
+        [state_encoding[state] for state, _ in keys],
+        [type_encoding[intensity_type] for _, intensity_type in keys],
+    )
+
+    states, types = list(state_encoding), list(type_encoding)
+    values = np.full((len(states), len(types), horizon), np.nan, dtype=np.float32)
+    for (state, intensity_type), forecast in zip(keys, forecasts):
+        values[states.index(state), types.index(intensity_type)] = forecast
+
+    version = datetime.now().strftime("%Y%m%dT%H%M%S")
+    meta = {
+        "version": version,
+        "file": f"forecast_table_{version}.npy",
+        "base_time": base_time.isoformat(),
+        "horizon": horizon,
+        "states": states,
+        "types": types,
+        "created_at": datetime.now().isoformat(),
+    }
+    publish_forecast_table(values, meta, forecast_dir)
+    return meta
+
+
+def publish_forecast_table(values, meta, forecast_dir=FORECAST_DIR):
+    """Write the table next to older versions and atomically repoint latest.json"""
+    forecast_dir = Path(forecast_dir)
+    forecast_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = forecast_dir / f"{meta['file']}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, values)
+    os.replace(tmp_path, forecast_dir / meta["file"])
+
+    tmp_pointer = forecast_dir / "latest.json.tmp"
+    tmp_pointer.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_pointer, forecast_dir / "latest.json")
+
+    # Readers keep their mapping of removed files, so old versions can go
+    for old in sorted(forecast_dir.glob("forecast_table_*.npy"))[
+        :-FORECAST_KEEP_VERSIONS
+    ]:
+        old.unlink()
+
+
+class ForecastTable:
+    """Memory-mapped forecast table with O(1) lookups"""
+
+    def __init__(self, meta, values):
+        self.version = meta["version"]
+        self.horizon = meta["horizon"]
+        self.base_hour = epoch_hour(datetime.fromisoformat(meta["base_time"]))
+        self.state_index = {state: i for i, state in enumerate(meta["states"])}
+        self.type_index = {t: i for i, t in enumerate(meta["types"])}
+        self.values = values
+
+    def lookup(self, state, intensity_type, target_time):
+        """Return the precomputed forecast, or None if the table does not cover it"""
+        if target_time.minute or target_time.second or target_time.microsecond:
+            return None
+        offset = epoch_hour(target_time) - self.base_hour
+        if not 0 <= offset < self.horizon:
+            return None
+        value = float(
+            self.values[
+                self.state_index[state], self.type_index[intensity_type], offset
+            ]
+        )
+        return None if math.isnan(value) else value
+
+
+def load_forecast_table(forecast_dir=FORECAST_DIR):
+    """Memory-map the table latest.json points to"""
+    meta = json.loads((Path(forecast_dir) / "latest.json").read_text())
+    values = np.load(Path(forecast_dir) / meta["file"], mmap_mode="r")
+    return ForecastTable(meta, values)
+
+
+_table = None
+_pointer_mtime = None
+_checked_at = None
+
+
+def get_forecast_table(forecast_dir=FORECAST_DIR):
+    """Current table, re-checking latest.json at most every FORECAST_REFRESH_SECONDS"""
+    global _table, _pointer_mtime, _checked_at
+    now = time.monotonic()
+    if _checked_at is not None and now - _checked_at < FORECAST_REFRESH_SECONDS:
+        return _table
+    _checked_at = now
+
+    pointer = Path(forecast_dir) / "latest.json"
+    if not pointer.exists():
+        _table, _pointer_mtime = None, None
+    elif pointer.stat().st_mtime_ns != _pointer_mtime:
+        _pointer_mtime = pointer.stat().st_mtime_ns
+        _table = load_forecast_table(forecast_dir)
+    return _table
+
+
+if __name__ == "__main__":
+    from data_processing.prepare_features import load_and_combine_data
+    from deployment.model_bundle import load_bundle, read_bundle_metadata
+    from experiments.predict import load_model_from_registry
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--horizon", type=int, default=FORECAST_HORIZON_HOURS)
+    parser.add_argument("--output", default=str(FORECAST_DIR))
+    args = parser.parse_args()
+
+    if read_bundle_metadata() is not None:
+        print("Loading model bundle...")
+        model, meta = load_bundle()
+        encodings = {k: meta[k] for k in ["state_encoding", "type_encoding"]}
+    else:
+        print("Loading model from registry...")
+        model = load_model_from_registry()
+        encodings = {"state_encoding": STATE_ENCODING, "type_encoding": TYPE_ENCODING}
+
+    print("Loading latest data...")
+    df = load_and_combine_data()
+
+    print(f"Forecasting {args.horizon} hours ahead...")
+    meta = build_forecast_table(model, df, encodings, args.horizon, args.output)
+    print(f"Published forecast table {meta['version']} from {meta['base_time']}")
@@ -0,0 +1,179 @@
+import bisect
+import contextvars
+import time
+
+LATENCY_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+BATCH_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+# Stage marks of the request being handled, None when metrics are disabled
+current_timer = contextvars.ContextVar("current_timer", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class RequestTimer:
+    """Stage marks set by a handler, turned into histograms after the response"""
+
+    __slots__ = ("start", "marks", "model_version")
+
+    def __init__(self, start):
+        self.start = start
+        self.marks = []
+        self.model_version = None
+
+    def mark(self, stage):
+        """Record that `stage` ended now (it started at the previous mark)"""
+        self.marks.append((stage, time.perf_counter()))
+
+
+class Metrics:
+    """Minimal Prometheus-style histograms and gauges"""
+
+    def __init__(self, prefix="co2_api"):
+        self.prefix = prefix
+        self.histograms = {}
+        self.gauges = {}
+        self.in_flight = 0
+        # Histograms the middleware updates on every request, by unlabelled keys
+        self.request_histograms = {}
+        self.stage_histograms = {}
+
+    def histogram(self, name, labels, buckets=LATENCY_BUCKETS):
+        """labels is a tuple of (name, value) pairs"""
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[(name, labels)] = Histogram(buckets)
+        return histogram
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        self.histogram(name, labels, buckets).observe(value)
+
+    def request_histogram(self, path, status):
+        """Histogram of request_seconds, found without building label tuples"""
+        histogram = self.request_histograms.get((path, status))
+        if histogram is None:
+            labels = (("path", path), ("status", str(status)))
+            histogram = self.histogram("request_seconds", labels)
+            self.request_histograms[(path, status)] = histogram
+        return histogram
+
+    def stage_histogram(self, path, version, stage):
+        """Histogram of stage_seconds, found without building label tuples"""
+        by_stage = self.stage_histograms.get((path, version))
+        if by_stage is None:
+            by_stage = self.stage_histograms[(path, version)] = {}
+        histogram = by_stage.get(stage)
+        if histogram is None:
+            labels = (("path", path), ("stage", stage), ("model_version", version))
+            histogram = by_stage[stage] = self.histogram("stage_seconds", labels)
+        return histogram
+
+    def gauge(self, name, read, labels=()):
+        """Register a gauge whose value is read at scrape time"""
+        self.gauges[(name, labels)] = read
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = [
+            f"# TYPE {self.prefix}_in_flight_requests gauge",
+            f"{self.prefix}_in_flight_requests {self.in_flight}",
+        ]
+        typed = set()
+        # Series of one metric must be adjacent; sorted() is stable per name
+        gauges = sorted(self.gauges.items(), key=lambda item: item[0][0])
+        for (name, labels), read in gauges:
+            if name not in typed:
+                lines.append(f"# TYPE {self.prefix}_{name} gauge")
+                typed.add(name)
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            label_text = label_text and f"{{{label_text}}}"
+            lines.append(f"{self.prefix}_{name}{label_text} {read()}")
+
+        for (name, labels), histogram in sorted(
+            self.histograms.items(), key=lambda item: str(item[0])
+        ):
+            metric = f"{self.prefix}_{name}"
+            if name not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(name)
+            label_text = "".join(f'{k}="{v}",' for k, v in labels)
+            cumulative = 0
+            for bound, count in zip(
+                [*histogram.buckets, "+Inf"], histogram.counts, strict=True
+            ):
+                cumulative += count
+                lines.append(
+                    f'{metric}_bucket{{{label_text}le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{metric}_sum{{{label_text.rstrip(',')}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{label_text.rstrip(',')}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing requests and the stages their handlers mark
+
+    Validation is the time until the handler's first mark. Serialization is
+    not a stage of its own: it is request_seconds minus the stage sum, which
+    saves an observation on every request.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timer = RequestTimer(time.perf_counter())
+        token = current_timer.set(timer)
+        status = []
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            end = time.perf_counter()
+            self.metrics.in_flight -= 1
+            current_timer.reset(token)
+
+            path = getattr(scope.get("route"), "path", "unmatched")
+            self.metrics.request_histogram(path, status[0] if status else 500).observe(
+                end - timer.start
+            )
+            previous = timer.start
+            for stage, at in timer.marks:
+                self.metrics.stage_histogram(path, timer.model_version, stage).observe(
+                    at - previous
+                )
+                previous = at
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.config import (
+    MODEL_BUNDLE_DIR,
+    MODEL_NAME,
+    STATE_ENCODING,
+    TYPE_ENCODING,
+)
+
+
+def read_bundle_metadata(bundle_dir=MODEL_BUNDLE_DIR):
+    """Metadata of the current bundle, or None if none has been exported"""
+    path = Path(bundle_dir) / "metadata.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def load_bundle(bundle_dir=MODEL_BUNDLE_DIR):
+    """Load the bundled model with plain xgboost, no MLflow involved"""
+    import xgboost as xgb
+
+    meta = read_bundle_metadata(bundle_dir)
+    model = xgb.XGBRegressor()
+    model.load_model(Path(bundle_dir) / meta["file"])
+    return model, meta
+
+
+def export_bundle(version=None, bundle_dir=MODEL_BUNDLE_DIR):
+    """Write a registry version as native UBJSON plus feature order and encodings
+
+    Files are versioned and metadata.json is replaced last, so a running API
+    never reads a half-written bundle.
+    """
+    import mlflow
+    import mlflow.xgboost
+
+    client = mlflow.tracking.MlflowClient()
+    versions = client.search_model_versions(f"name='{MODEL_NAME}'")
+    if version is None:
+        version = str(max(int(v.version) for v in versions))
+    run_id = next(v.run_id for v in versions if str(v.version) == str(version))
+
+    model = mlflow.xgboost.load_model(f"models:/{MODEL_NAME}/{version}")
+    try:
+        encodings_path = mlflow.artifacts.download_artifacts(
+            run_id=run_id, artifact_path="encodings.json"
+        )
+        encodings = json.loads(Path(encodings_path).read_text())
+    except Exception:
+        print("No encodings logged with this run, using configured encodings")
+        encodings = {"state_encoding": STATE_ENCODING, "type_encoding": TYPE_ENCODING}
+
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    meta = {
+        "model_name": MODEL_NAME,
+        "model_version": str(version),
+        "run_id": run_id,
+        "file": f"model-{version}.ubj",
+        "feature_order": model.get_booster().feature_names,
+        **encodings,
+        "exported_at": datetime.now().isoformat(),
+    }
+    model.save_model(bundle_dir / meta["file"])
+
+    tmp_path = bundle_dir / "metadata.json.tmp"
+    tmp_path.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_path, bundle_dir / "metadata.json")
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", default=None, help="Registry version (latest)")
+    parser.add_argument("--output", default=str(MODEL_BUNDLE_DIR))
+    args = parser.parse_args()
+
+    meta = export_bundle(args.version, args.output)
+    print(f"Exported model version {meta['model_version']} to {args.output}")
@@ -0,0 +1,189 @@
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+class PredictionLogger:
+    """Non-blocking log of served predictions
+
+    The request path only appends a tuple to an in-memory buffer bounded by
+    rows, so a batch record counts as many rows as it holds. A background
+    thread turns buffered records into JSONL lines with UTC timestamps and
+    writes them to segments rotated by size or age. When the buffer is full,
+    the policy decides which records are lost ("drop_newest" or
+    "drop_oldest"); a batch larger than the whole buffer is always dropped,
+    and requests are never blocked. Filling past half the buffer wakes the
+    writer early. Records that fail to format or write are counted and
+    skipped.
+    """
+
+    def __init__(
+        self,
+        log_dir,
+        buffer_size=10000,
+        policy="drop_newest",
+        flush_seconds=1.0,
+        rotate_bytes=64 * 1024 * 1024,
+        rotate_seconds=3600,
+    ):
+        self.log_dir = Path(log_dir)
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.flush_seconds = flush_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.buffer = deque()
+        self.buffered_rows = 0
+        self.lock = threading.Lock()  # Shared by request handlers and the writer
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.segment = None
+        self.segment_opened = 0.0
+        self.logged = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def log(self, record):
+        """Buffer a record; returns False if the drop policy discarded it"""
+        rows = record_rows(record)
+        with self.lock:
+            if rows > self.buffer_size or (
+                self.policy == "drop_newest"
+                and self.buffered_rows + rows > self.buffer_size
+            ):
+                self.dropped += rows
+                return False
+            while self.buffered_rows + rows > self.buffer_size:  # drop_oldest
+                evicted = record_rows(self.buffer.popleft())
+                self.buffered_rows -= evicted
+                self.dropped += evicted
+            self.buffer.append(record)
+            self.buffered_rows += rows
+            self.logged += rows
+            half_full = self.buffered_rows > self.buffer_size // 2
+        if half_full:
+            self.wake.set()
+        return True
+
+    def log_prediction(
+        self, state, intensity_type, features, prediction, version, target_time=None
+    ):
+        record = (state, intensity_type, features, prediction, version, target_time)
+        return self.log((time.time(), *record))
+
+    def log_batch(self, matrix, predictions, version):
+        """One record for a whole batch; rows are expanded by the writer
+
+        Batch rows carry encoded features only, so state and type are null.
+        """
+        return self.log((time.time(), None, None, matrix, predictions, version, None))
+
+    def start(self):
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Stop the writer after flushing everything buffered"""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wake.wait(self.flush_seconds)
+            self.wake.clear()
+            self.flush()
+        self.flush()
+        if self.segment is not None:
+            self.segment.close()
+
+    def flush(self):
+        with self.lock:
+            records = list(self.buffer)
+            self.buffer.clear()
+            self.buffered_rows = 0
+        lines = []
+        for record in records:
+            try:
+                lines.extend(self.format(record))
+            except Exception as e:
+                self.failed += record_rows(record)
+                print(f"Prediction log record skipped: {e}")
+        if not lines:
+            return
+        try:
+            segment = self.current_segment()
+            segment.write("".join(lines))
+            segment.flush()
+        except OSError as e:
+            self.failed += len(lines)
+            print(f"Prediction log write failed: {e}")
+            self.segment = None  # Reopen a new segment next time
+            return
+        self.written += len(lines)
+
+    def format(self, record):
+        timestamp, state, intensity_type, features, prediction, version, target = record
+        served_at = datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+        if state is not None:
+            features = None if features is None else list(features)
+            rows = [(state, intensity_type, features, prediction)]
+        else:
+            rows = [
+                (None, None, row.tolist(), float(value))
+                for row, value in zip(features, prediction)
+            ]
+        return [
+            json.dumps(
+                {
+                    "timestamp": served_at,
+                    "state": row_state,
+                    "type": row_type,
+                    "features": row_features,
+                    "prediction": row_prediction,
+                    "model_version": version,
+                    "target_time": target and target.isoformat(),
+                }
+            )
+            + "\n"
+            for row_state, row_type, row_features, row_prediction in rows
+        ]
+
+    def current_segment(self):
+        """Open segment, rotated once it is too large or too old"""
+        if self.segment is not None and (
+            self.segment.tell() >= self.rotate_bytes
+            or time.monotonic() - self.segment_opened >= self.rotate_seconds
+        ):
+            self.segment.close()
+            self.segment = None
+        if self.segment is None:
+            now = datetime.now(timezone.utc)
+            name = now.strftime("predictions-%Y%m%dT%H%M%S%f.jsonl")
+            self.segment = open(self.log_dir / name, "a")
+            self.segment_opened = time.monotonic()
+        return self.segment
+
+    def stats(self):
+        return {
+            "buffered": self.buffered_rows,
+            "buffer_size": self.buffer_size,
+            "policy": self.policy,
+            "logged": self.logged,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+        }
+
+
+def record_rows(record):
+    """Predictions in a buffered record: a batch holds many, others one"""
+    state, predictions = record[1], record[4]
+    return 1 if state is not None or predictions is None else len(predictions)
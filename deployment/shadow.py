@@ -0,0 +1,140 @@
+import queue
+import threading
+
+import numpy as np
+
+
+class ShadowEvaluator:
+    """Off-path comparison of shadow model versions with the serving model
+
+    The request path only offers the encoded features it already built and
+    the served predictions to a queue bounded by rows (a batch matrix may be a
+    view keeping the request body alive, so rows are what costs memory); work
+    that would exceed the bound is dropped and counted, so requests never
+    wait on shadow models.
+    Every flush_seconds a background thread stacks the queued requests into
+    one matrix, runs each shadow model on it once and accumulates the
+    divergence per version. Shadow versions must share the serving model's
+    feature encodings.
+    """
+
+    def __init__(self, queue_rows=10000, batch_rows=10000, flush_seconds=0.1):
+        self.queue = queue.Queue()
+        self.queue_rows = queue_rows
+        self.queued_rows = 0
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.models = {}
+        self.divergence = {}
+        self.lock = threading.Lock()  # Shared with request handlers
+        self.stopped = threading.Event()
+        self.thread = None
+        self.submitted = 0
+        self.dropped = 0
+
+    def add_model(self, version, model):
+        with self.lock:
+            self.models[version] = model
+            self.divergence[version] = {
+                "count": 0,
+                "abs_sum": 0.0,
+                "diff_sum": 0.0,
+                "max_abs": 0.0,
+                "errors": 0,
+            }
+
+    def submit(self, features, predictions, version):
+        """Queue one request's encoded features (a row or a matrix) and outputs
+
+        Returns False when there are no shadow models or the rows would not
+        fit in the queue.
+        """
+        if not self.models:
+            return False
+        rows = len(features) if getattr(features, "ndim", 1) == 2 else 1
+        with self.lock:
+            if self.queued_rows + rows > self.queue_rows:
+                self.dropped += 1
+                return False
+            self.queued_rows += rows
+            self.submitted += 1
+        self.queue.put_nowait((features, predictions, version, rows))
+        return True
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Stop after evaluating everything already queued"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.flush_seconds):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Evaluate everything queued, in batches of about batch_rows rows"""
+        while True:
+            items, rows = [], 0
+            while rows < self.batch_rows:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+                rows += items[-1][3]
+            if not items:
+                return
+            try:
+                self.evaluate(items)
+            finally:
+                with self.lock:
+                    self.queued_rows -= rows
+
+    def evaluate(self, items):
+        """Run every shadow model on the stacked features of queued requests"""
+        matrix = np.vstack(
+            [np.atleast_2d(np.asarray(f, dtype=np.float32)) for f, _, _, _ in items]
+        )
+        served = np.concatenate([np.atleast_1d(p) for _, p, _, _ in items])
+        served_by = np.repeat([v for _, _, v, _ in items], [n for *_, n in items])
+        for version, model in list(self.models.items()):
+            # A version that is also serving is not its own shadow
+            compared = served_by != version
+            if not compared.any():
+                continue
+            try:
+                diff = model.predict(matrix[compared]) - served[compared]
+            except Exception as e:
+                print(f"Shadow version {version} failed: {e}")
+                with self.lock:
+                    self.divergence[version]["errors"] += 1
+                continue
+            with self.lock:
+                stats = self.divergence[version]
+                stats["count"] += len(diff)
+                stats["abs_sum"] += float(np.abs(diff).sum())
+                stats["diff_sum"] += float(diff.sum())
+                stats["max_abs"] = max(stats["max_abs"], float(np.abs(diff).max()))
+
+    def stats(self):
+        with self.lock:
+            versions = {
+                version: {
+                    "count": s["count"],
+                    "mean_abs_diff": s["abs_sum"] / s["count"] if s["count"] else None,
+                    "mean_diff": s["diff_sum"] / s["count"] if s["count"] else None,
+                    "max_abs_diff": s["max_abs"],
+                    "errors": s["errors"],
+                }
+                for version, s in self.divergence.items()
+            }
+        return {
+            "versions": versions,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "queued_rows": self.queued_rows,
+        }
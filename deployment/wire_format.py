@@ -0,0 +1,64 @@
+import json
+import struct
+
+import numpy as np
+
+RAW_CONTENT_TYPE = "application/octet-stream"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def encode_raw(columns, matrix):
+    """Raw float32 matrix: uint32 header length, JSON schema header, row-major data
+
+    The header is padded so the data starts 4-byte aligned.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype="<f4")
+    header = json.dumps({"columns": list(columns), "rows": len(matrix)}).encode()
+    header += b" " * (-(len(header) + 4) % 4)
+    return struct.pack("<I", len(header)) + header + matrix.tobytes()
+
+
+def decode_raw(body):
+    """Schema columns and a zero-copy (rows, columns) view of the data
+
+    Raises ValueError if the body is not a well-formed raw matrix.
+    """
+    try:
+        (header_length,) = struct.unpack_from("<I", body)
+        header = json.loads(body[4 : 4 + header_length])
+        columns, rows = list(header["columns"]), int(header["rows"])
+        matrix = np.frombuffer(body, dtype="<f4", offset=4 + header_length)
+        return columns, matrix.reshape(rows, len(columns))
+    except (struct.error, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Malformed raw feature matrix: {e}") from e
+
+
+def encode_arrow(columns, matrix):
+    """Arrow IPC stream with one float32 column per matrix column"""
+    import pyarrow as pa
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+    table = pa.table({name: matrix[:, i] for i, name in enumerate(columns)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_arrow(body):
+    """Schema columns and a (rows, columns) float32 matrix of an Arrow IPC stream
+
+    Arrow stores columns separately, so building the row-major matrix the
+    predictor needs costs one copy; use the raw format to avoid it. Raises
+    ValueError if the body is not an Arrow stream of numeric columns.
+    """
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+        matrix = np.empty((table.num_rows, table.num_columns), dtype=np.float32)
+        for i, column in enumerate(table.columns):
+            matrix[:, i] = column.to_numpy()
+    except (pa.ArrowException, OSError, TypeError, ValueError) as e:
+        raise ValueError(f"Malformed Arrow feature stream: {e}") from e
+    return table.column_names, matrix
@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from experiments.config import LAG_FEATURES
+from experiments.predict import recursive_forecast
+
+BACKTEST_DIR = Path("reports/backtest")
+STAT_COLUMNS = ["count", "abs_sum", "sq_sum", "ape_sum", "ape_count"]
+
+
+def hourly_series(df):
+    """Values of every (state, type) series on a gap-preserving hourly grid
+
+    Returns {(state, type): (first hour as datetime64[h], float32 values)};
+    missing hours are NaN so origins touching a gap can be skipped.
+    """
+    series = {}
+    for (state, intensity_type), group in df.groupby(["state", "type"]):
+        values = group.set_index(group["timestamp"].dt.floor("h"))["value"]
+        values = values[~values.index.duplicated(keep="last")].sort_index()
+        values = values.reindex(
+            pd.date_range(values.index[0], values.index[-1], freq="h")
+        )
+        first_hour = values.index[0].to_datetime64().astype("datetime64[h]")
+        series[(state, intensity_type)] = (first_hour, values.to_numpy(np.float32))
+    return series
+
+
+def origin_tensors(first_hour, values, origins, horizon):
+    """History and actual windows of one series for many forecast origins
+
+    origins are first target hours (datetime64[h]). Each origin gets the
+    max(LAG_FEATURES) values before it and the `horizon` values from it, cut
+    from one sliding-window view; origins outside the series or touching a
+    gap are dropped. Returns (history, actual, origins).
+    """
+    window = max(LAG_FEATURES)
+    index = (np.asarray(origins, dtype="datetime64[h]") - first_hour).astype(np.int64)
+    index = index[(index >= window) & (index + horizon <= len(values))]
+    if len(index) == 0:
+        return np.empty((0, window)), np.empty((0, horizon)), index
+    rows = sliding_window_view(values, window + horizon)[index - window]
+    complete = ~np.isnan(rows).any(axis=1)
+    rows, index = rows[complete], index[complete]
+    return rows[:, :window], rows[:, window:], first_hour + index
+
+
+def backtest_chunk(model, chunk, origins, horizon, encodings):
+    """Error statistics for a group of series, forecast in one batched pass
+
+    Every origin of every series in the chunk is forecast together, so each
+    horizon step is a single predict call over all of them. Returns summed
+    errors per (state, type, hour of day, horizon).
+    """
+    histories, actuals, starts, keys = [], [], [], []
+    for state, intensity_type, first_hour, values in chunk:
+        history, actual, start = origin_tensors(first_hour, values, origins, horizon)
+        histories.append(history)
+        actuals.append(actual)
+        starts.append(start)
+        keys.extend([(state, intensity_type)] * len(start))
+    if not keys:
+        return pd.DataFrame(columns=["state", "type", "hour", "horizon", *STAT_COLUMNS])
+
+    states, types = np.array(keys).T
+    actual = np.concatenate(actuals)
+    start = np.concatenate(starts)
+    predicted = recursive_forecast(
+        model,
+        np.concatenate(histories),
+        start,
+        horizon,
+        [encodings["state_encoding"][s] for s in states],
+        [encodings["type_encoding"][t] for t in types],
+    )
+
+    error = np.abs(predicted - actual)
+    target_hour = (start[:, None] + np.arange(horizon)).astype(np.int64) % 24
+    nonzero = actual != 0
+    ape = np.divide(error, np.abs(actual), out=np.zeros_like(error), where=nonzero)
+    errors = pd.DataFrame(
+        {
+            "state": np.repeat(states, horizon),
+            "type": np.repeat(types, horizon),
+            "hour": target_hour.ravel(),
+            "horizon": np.tile(np.arange(1, horizon + 1), len(start)),
+            "count": 1,
+            "abs_sum": error.ravel(),
+            "sq_sum": (error**2).ravel(),
+            "ape_sum": ape.ravel(),
+            "ape_count": nonzero.ravel().astype(int),
+        }
+    )
+    return errors.groupby(["state", "type", "hour", "horizon"], as_index=False).sum()
+
+
+def load_worker_model(model_bytes):
+    import xgboost as xgb
+
+    model = xgb.XGBRegressor(n_jobs=1)  # One core per worker process
+    model.load_model(bytearray(model_bytes))
+    return model
+
+
+def backtest_chunk_worker(model_bytes, chunk, origins, horizon, encodings):
+    model = load_worker_model(model_bytes)
+    return backtest_chunk(model, chunk, origins, horizon, encodings)
+
+
+def run_backtest(
+    model,
+    series,
+    origins,
+    horizon,
+    encodings,
+    output_dir=BACKTEST_DIR,
+    chunk_size=2,
+    workers=1,
+):
+    """Backtest all series in chunks, saving each chunk's statistics
+
+    Chunks already saved in output_dir are reused, so an interrupted run
+    resumes where it stopped. With several workers, chunks run in separate
+    processes that each rebuild the XGBoost model from its serialized form.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    items = [
+        (s, t, first, values) for (s, t), (first, values) in sorted(series.items())
+    ]
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    paths = [output_dir / f"chunk-{i:04d}.csv" for i in range(len(chunks))]
+    todo = [i for i, path in enumerate(paths) if not path.exists()]
+    print(f"{len(chunks) - len(todo)} of {len(chunks)} chunks already done")
+
+    def save(i, stats):
+        tmp_path = paths[i].with_suffix(".tmp")
+        stats.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, paths[i])
+
+    if workers > 1 and todo:
+        model_bytes = bytes(model.get_booster().save_raw("ubj"))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                i: pool.submit(
+                    backtest_chunk_worker,
+                    model_bytes,
+                    chunks[i],
+                    origins,
+                    horizon,
+                    encodings,
+                )
+                for i in todo
+            }
+            for i, future in futures.items():
+                save(i, future.result())
+                print(f"Chunk {i + 1}/{len(chunks)} done")
+    else:
+        for i in todo:
+            save(i, backtest_chunk(model, chunks[i], origins, horizon, encodings))
+            print(f"Chunk {i + 1}/{len(chunks)} done")
+
+    return pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+
+
+def summarize(stats):
+    """MAE, RMSE and MAPE overall and by state, type, hour of day and horizon"""
+
+    def metrics(totals):
+        return pd.DataFrame(
+            {
+                "count": totals["count"],
+                "mae": totals["abs_sum"] / totals["count"],
+                "rmse": np.sqrt(totals["sq_sum"] / totals["count"]),
+                "mape": totals["ape_sum"] / totals["ape_count"] * 100,
+            }
+        )
+
+    overall = stats[STAT_COLUMNS].sum().to_frame().T
+    report = {"overall": metrics(overall).iloc[0].to_dict()}
+    for dimension in ["state", "type", "hour", "horizon"]:
+        totals = stats.groupby(dimension)[STAT_COLUMNS].sum()
+        report[f"by_{dimension}"] = metrics(totals).to_dict(orient="index")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest")
+    parser.add_argument("--horizon", type=int, default=24, help="Hours ahead")
+    parser.add_argument("--days", type=int, default=30, help="Days of origins")
+    parser.add_argument("--stride", type=int, default=1, help="Hours between origins")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=2, help="Series per chunk")
+    parser.add_argument("--output", default=str(BACKTEST_DIR))
+    args = parser.parse_args()
+
+    from data_processing.prepare_features import load_and_combine_data
+    from deployment.config import STATE_ENCODING, TYPE_ENCODING
+    from deployment.model_bundle import load_bundle, read_bundle_metadata
+    from experiments.predict import load_model_from_registry
+
+    if read_bundle_metadata() is not None:
+        print("Loading model bundle...")
+        model, meta = load_bundle()
+        version = meta["model_version"]
+        encodings = {k: meta[k] for k in ["state_encoding", "type_encoding"]}
+    else:
+        print("Loading model from registry...")
+        model, version = load_model_from_registry(), "registry-latest"
+        encodings = {"state_encoding": STATE_ENCODING, "type_encoding": TYPE_ENCODING}
+
+    print("Loading data...")
+    series = hourly_series(load_and_combine_data())
+    last_hour = max(first + len(values) - 1 for first, values in series.values())
+    end = last_hour - args.horizon + 1
+    origins = np.arange(end - args.days * 24, end + 1, args.stride)
+
+    # A rerun with the same settings resumes; different settings need a new dir
+    output_dir = Path(args.output)
+    config = {
+        "model_version": str(version),
+        "horizon": args.horizon,
+        "origins": [str(origins[0]), str(origins[-1]), args.stride],
+        "chunk_size": args.chunk_size,
+    }
+    config_path = output_dir / "config.json"
+    if config_path.exists() and json.loads(config_path.read_text()) != config:
+        sys.exit(f"{output_dir} holds a backtest with other settings; use --output")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    config_path.write_text(json.dumps(config, indent=2))
+
+    print(f"Backtesting {len(series)} series, {len(origins)} origins each...")
+    stats = run_backtest(
+        model,
+        series,
+        origins,
+        args.horizon,
+        encodings,
+        output_dir,
+        args.chunk_size,
+        args.workers,
+    )
+    report = summarize(stats)
+    (output_dir / "report.json").write_text(json.dumps(report, indent=2))
+
+    overall = report["overall"]
+    print(
+        f"Overall: MAE {overall['mae']:.2f}, RMSE {overall['rmse']:.2f}, "
+        f"MAPE {overall['mape']:.2f}% ({int(overall['count'])} forecasts)"
+    )
+    print("MAE by horizon:")
+    for horizon, values in report["by_horizon"].items():
+        print(f"  +{horizon:2d}h: {values['mae']:.2f}")
+    print("MAE by state:")
+    for state, values in report["by_state"].items():
+        print(f"  {state}: {values['mae']:.2f}")
+    print(f"Full report: {output_dir / 'report.json'}")
+
+
+if __name__ == "__main__":
+    main()
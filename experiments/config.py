@@ -14,6 +14,16 @@ XGBOOST_PARAMS = {
 
 # Feature engineering
 LAG_FEATURES = [1, 2, 3, 24, 48, 168]  # Hours
+FEATURE_COLUMNS = [
+    "hour",
+    "day_of_week",
+    "month",
+    "quarter",
+    "is_weekend",
+    *[f"value_lag_{lag}" for lag in LAG_FEATURES],
+    "state_encoded",
+    "type_encoded",
+]
 TEST_SIZE = 0.2
 CV_SPLITS = 5
 
@@ -1,13 +1,19 @@
+import argparse
+import sys
 from pathlib import Path
 
-import mlflow
-import mlflow.xgboost
 import numpy as np
 import pandas as pd
 
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from experiments.config import FEATURE_COLUMNS, LAG_FEATURES
+
 
 def load_model_from_registry(model_name="co2-intensity-xgboost", version="latest"):
     """Load model from MLflow model registry"""
+    import mlflow.xgboost
+
     model_uri = f"models:/{model_name}/{version}"
     model = mlflow.xgboost.load_model(model_uri)
     return model
@@ -38,9 +44,50 @@ def predict_sample(model, state="BW", intensity_type="consumption", hour=12):
     return prediction[0]
 
 
+def recursive_forecast(model, history, start, horizon, state_encoded, type_encoded):
+    """Forecast several hours ahead for many series at once
+
+    history holds the last max(LAG_FEATURES) hourly values of each series
+    (oldest first) and start the first target hour of each series. Every step
+    predicts all series in one call and feeds the predictions back as lags.
+    """
+    window = max(LAG_FEATURES)
+    buffer = np.empty((len(history), window + horizon), dtype=np.float32)
+    buffer[:, :window] = history
+    start = np.asarray(start, dtype="datetime64[h]")
+
+    for step in range(horizon):
+        times = pd.DatetimeIndex((start + step).astype("datetime64[s]"))
+        features = pd.DataFrame(
+            {
+                "hour": times.hour,
+                "day_of_week": times.dayofweek,
+                "month": times.month,
+                "quarter": times.quarter,
+                "is_weekend": (times.dayofweek >= 5).astype(int),
+                **{
+                    f"value_lag_{lag}": buffer[:, window + step - lag]
+                    for lag in LAG_FEATURES
+                },
+                "state_encoded": state_encoded,
+                "type_encoded": type_encoded,
+            }
+        )[FEATURE_COLUMNS]
+        buffer[:, window + step] = model.predict(features)
+
+    return buffer[:, window:]
+
+
 def main():
+    parser = argparse.ArgumentParser(
+        description="Sample predictions from a registered model"
+    )
+    parser.add_argument("--model-name", default="co2-intensity-xgboost")
+    parser.add_argument("--version", default="latest")
+    args = parser.parse_args()
+
     print("Loading model from registry...")
-    model = load_model_from_registry()
+    model = load_model_from_registry(args.model_name, args.version)
 
     print("Making sample predictions...")
     for hour in [6, 12, 18, 22]:
@@ -1,19 +1,25 @@
 import argparse
+import sys
 from datetime import datetime
 from pathlib import Path
 
-import mlflow
-import mlflow.sklearn
-import mlflow.xgboost
 import numpy as np
 import pandas as pd
-import xgboost as xgb
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import TimeSeriesSplit, train_test_split
-from sklearn.preprocessing import LabelEncoder
 
-# Set MLflow experiment
-mlflow.set_experiment("co2-intensity-forecast")
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from experiments.config import EXPERIMENT_NAME
+
+# mlflow, xgboost and sklearn are imported where they are used, so importing
+# this module (or running it with --help) stays fast and has no side effects
+
+
+def start_run():
+    """Start an MLflow run in the project experiment"""
+    import mlflow
+
+    mlflow.set_experiment(EXPERIMENT_NAME)
+    return mlflow.start_run()
 
 
 def load_processed_data(data_path="data/processed/ml_dataset.csv"):
@@ -25,6 +31,8 @@ def load_processed_data(data_path="data/processed/ml_dataset.csv"):
 
 def prepare_features(df):
     """Prepare features for training"""
+    from sklearn.preprocessing import LabelEncoder
+
     # Encode categorical variables
     le_state = LabelEncoder()
     le_type = LabelEncoder()
@@ -43,10 +51,23 @@ def prepare_features(df):
     return X, y, le_state, le_type
 
 
-def train_xgboost_model(X, y, test_size=0.2, random_state=42):
+def label_encodings(le_state, le_type):
+    """Category codes assigned by the label encoders, for serving"""
+    return {
+        "state_encoding": {str(c): i for i, c in enumerate(le_state.classes_)},
+        "type_encoding": {str(c): i for i, c in enumerate(le_type.classes_)},
+    }
+
+
+def train_xgboost_model(X, y, test_size=0.2, random_state=42, encodings=None):
     """Train XGBoost model with MLflow tracking"""
+    import mlflow
+    import mlflow.xgboost
+    import xgboost as xgb
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
 
-    with mlflow.start_run():
+    with start_run():
         # Split data (time-aware split for time series)
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=test_size, random_state=random_state, shuffle=False
@@ -97,7 +118,9 @@ def train_xgboost_model(X, y, test_size=0.2, random_state=42):
             }
         )
 
-        # Log model
+        # Log model together with the encodings serving needs
+        if encodings is not None:
+            mlflow.log_dict(encodings, "encodings.json")
         mlflow.xgboost.log_model(
             model, "model", registered_model_name="co2-intensity-xgboost"
         )
@@ -112,8 +135,12 @@ def train_xgboost_model(X, y, test_size=0.2, random_state=42):
 
 def cross_validate_model(X, y, n_splits=5):
     """Perform time series cross-validation"""
+    import mlflow
+    import xgboost as xgb
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import TimeSeriesSplit
 
-    with mlflow.start_run():
+    with start_run():
         tscv = TimeSeriesSplit(n_splits=n_splits)
 
         cv_scores = []
@@ -160,7 +187,9 @@ def main():
 
     if args.mode == "train":
         print("Training model...")
-        model, metrics = train_xgboost_model(X, y)
+        model, metrics = train_xgboost_model(
+            X, y, encodings=label_encodings(le_state, le_type)
+        )
     elif args.mode == "cv":
         print("Running cross-validation...")
         cv_scores = cross_validate_model(X, y)
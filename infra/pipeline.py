@@ -1,74 +1,534 @@
+import argparse
+import cProfile
+import hashlib
+import json
+import os
+import resource
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 
+# Add parent directory to path for in-process steps
+sys.path.append(str(Path(__file__).parent.parent))
 
-def run_pipeline():
-    """Simple workflow orchestration"""
-    print("Starting CO₂ Forecast MLOps Pipeline")
-    print("=" * 50)
+CACHE_PATH = Path(".pipeline_cache.json")
+REPORT_DIR = Path("reports/pipeline")
 
-    steps = [
-        ("Data Processing", "make prepare-data"),
-        ("Model Training", "make train-model"),
-        ("Model Validation", "make train-cv"),
-        ("API Health Check", "make test-api"),
-        ("Monitoring", "pipenv run python monitoring/monitor.py"),
-    ]
 
-    results = {}
+def step(
+    name,
+    command,
+    deps=(),
+    inputs=(),
+    outputs=(),
+    timeout=300,
+    retries=0,
+    cache=True,
+    function=None,
+):
+    """Pipeline step definition
 
-    for step_name, command in steps:
-        print(f"\nRunning: {step_name}")
-        print(f"Command: {command}")
+    A cached step is skipped when its command, the content of its inputs
+    (files or directories) and the keys of its dependencies match its last
+    successful run and all of its outputs still exist. `function`, called
+    with the shared context, replaces the command in in-process mode.
+    """
+    return {
+        "name": name,
+        "command": command,
+        "function": function,
+        "deps": list(deps),
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "timeout": timeout,
+        "retries": retries,
+        "cache": cache,
+    }
 
-        try:
-            start_time = datetime.now()
-            result = subprocess.run(
-                command.split(),
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
+
+def prepare_data_inprocess(context):
+    from data_processing.prepare_features import prepare_ml_dataset
+
+    context["dataset"] = prepare_ml_dataset()
+
+
+def shared_features(context):
+    """Training features, prepared once for both training and validation"""
+    with context["lock"]:
+        if "features" not in context:
+            from experiments.train_model import load_processed_data, prepare_features
+
+            df = context.get("dataset")
+            if df is None:  # Data processing was cached
+                df = load_processed_data()
+            context["features"] = prepare_features(df)
+    return context["features"]
+
+
+def train_inprocess(context):
+    from experiments.train_model import label_encodings, train_xgboost_model
+
+    X, y, le_state, le_type = shared_features(context)
+    context["model"], _ = train_xgboost_model(
+        X, y, encodings=label_encodings(le_state, le_type)
+    )
+
+
+def validate_inprocess(context):
+    from experiments.train_model import cross_validate_model
+
+    X, y, _, _ = shared_features(context)
+    cross_validate_model(X, y)
+
+
+def export_inprocess(context):
+    from deployment.model_bundle import export_bundle
+
+    context["bundle"] = export_bundle()
+
+
+def forecast_table_inprocess(context):
+    from data_processing.prepare_features import load_and_combine_data
+    from deployment.forecast_table import build_forecast_table
+    from deployment.model_bundle import load_bundle, read_bundle_metadata
+
+    model = context.get("model")
+    if model is None:  # Training was cached
+        model, meta = load_bundle()
+    else:
+        meta = context.get("bundle") or read_bundle_metadata()
+    # Passed along rather than written into deployment.config, which other
+    # steps in this process share
+    encodings = {k: meta[k] for k in ["state_encoding", "type_encoding"]}
+    build_forecast_table(model, load_and_combine_data(), encodings)
+
+
+STEPS = [
+    step(
+        "Data Processing",
+        "make prepare-data",
+        function=prepare_data_inprocess,
+        inputs=["data/raw", "data_processing", "data_ingestion/config.py"],
+        outputs=["data/processed/ml_dataset.csv"],
+        timeout=600,
+    ),
+    step(
+        "Model Training",
+        "make train-model",
+        function=train_inprocess,
+        deps=["Data Processing"],
+        inputs=["data/processed/ml_dataset.csv", "experiments"],
+        timeout=1800,
+    ),
+    step(
+        "Model Validation",
+        "make train-cv",
+        function=validate_inprocess,
+        deps=["Data Processing"],
+        inputs=["data/processed/ml_dataset.csv", "experiments"],
+        timeout=1800,
+    ),
+    step(
+        "Model Export",
+        "make export-model",
+        function=export_inprocess,
+        deps=["Model Training"],
+        inputs=["deployment/model_bundle.py", "deployment/config.py"],
+        outputs=["models/metadata.json"],
+        retries=1,
+    ),
+    step(
+        "Forecast Table",
+        "make forecast-table",
+        function=forecast_table_inprocess,
+        deps=["Model Export"],
+        inputs=["deployment/forecast_table.py", "data/processed/ml_dataset.csv"],
+        outputs=["data/forecasts/latest.json"],
+    ),
+    step(
+        "API Health Check",
+        "make test-api",
+        deps=["Model Export"],
+        retries=1,
+        cache=False,
+    ),
+    step(
+        "Monitoring",
+        "pipenv run python monitoring/monitor.py",
+        deps=["Data Processing"],
+        cache=False,
+    ),
+]
+
+
+def file_digest(path, known):
+    """SHA-256 of a file, reused from `known` while its size and mtime match"""
+    stat = path.stat()
+    entry = known.get(str(path))
+    if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return entry[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    known[str(path)] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def input_files(inputs):
+    files = []
+    for name in inputs:
+        path = Path(name)
+        if path.is_dir():
+            files.extend(
+                p
+                for p in path.rglob("*")
+                if p.is_file() and "__pycache__" not in p.parts
             )
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+        elif path.exists():
+            files.append(path)
+    return sorted(files)
+
+
+def step_key(spec, dep_keys, known):
+    """Content hash of a step's command, inputs and upstream keys"""
+    digest = hashlib.sha256(spec["command"].encode())
+    for path in input_files(spec["inputs"]):
+        digest.update(f"{path}:{file_digest(path, known)}".encode())
+    for dep in spec["deps"]:
+        digest.update(dep_keys[dep].encode())
+    return digest.hexdigest()
+
+
+def load_cache(path):
+    if Path(path).exists():
+        return json.loads(Path(path).read_text())
+    return {"files": {}, "steps": {}}
+
+
+def save_cache(cache, path):
+    tmp_path = Path(f"{path}.tmp")
+    tmp_path.write_text(json.dumps(cache, indent=2))
+    os.replace(tmp_path, path)
+
+
+def usage_delta(before, after):
+    """CPU seconds and block I/O bytes between two rusage snapshots"""
+    return {
+        "cpu_seconds": (after.ru_utime + after.ru_stime)
+        - (before.ru_utime + before.ru_stime),
+        "read_bytes": (after.ru_inblock - before.ru_inblock) * 512,
+        "write_bytes": (after.ru_oublock - before.ru_oublock) * 512,
+    }
 
-            if result.returncode == 0:
-                print(f"SUCCESS: {step_name} completed successfully ({duration:.1f}s)")
-                results[step_name] = "SUCCESS"
-            else:
-                print(f"FAILED: {step_name} failed ({duration:.1f}s)")
-                print(f"Error: {result.stderr}")
-                results[step_name] = "FAILED"
 
-        except subprocess.TimeoutExpired:
-            print(f"TIMEOUT: {step_name} timed out")
-            results[step_name] = "TIMEOUT"
+def run_command(spec, profile_path=None, env=None, cwd=None):
+    """Run a step's command; returns (status, stderr, resource usage)
+
+    The child is reaped with wait4 so its own CPU time, peak RSS and block
+    I/O are measured. With a profile path and py-spy installed, the command
+    runs under the sampling profiler. env replaces the child's environment
+    and cwd its working directory.
+    The child leads its own process group, so a timeout also kills the
+    processes it started (make -> pipenv run -> python) instead of leaving
+    them running next to a retry.
+    """
+    command = spec["command"].split()
+    if profile_path is not None and shutil.which("py-spy"):
+        profile_path = profile_path.with_suffix(".svg")
+        command = ["py-spy", "record", "--subprocesses", "-o", str(profile_path)]
+        command += ["--", *spec["command"].split()]
+    else:
+        profile_path = None
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+            env=env,
+            cwd=cwd,
+            start_new_session=True,
+        )
+        timer = threading.Timer(spec["timeout"], kill)
+        timer.start()
+        try:
+            _, wait_status, usage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        process.returncode = os.waitstatus_to_exitcode(wait_status)
+        stderr.seek(0)
+        error = stderr.read().decode(errors="replace")
+
+    if timed_out.is_set():
+        status, error = "TIMEOUT", f"timed out after {spec['timeout']}s"
+    else:
+        status = "SUCCESS" if process.returncode == 0 else "FAILED"
+    zero = resource.struct_rusage((0,) * 16)
+    resources = {**usage_delta(zero, usage), "max_rss_kb": usage.ru_maxrss}
+    if profile_path is not None:
+        resources["profile"] = str(profile_path)
+    return status, error, resources
+
+
+def run_function(spec, context, profile_path=None):
+    """Run a step's function in this process, optionally under cProfile
+
+    CPU and I/O are this process's usage during the step, so they include
+    any steps running concurrently; peak RSS is the process peak so far.
+    Profile with --workers 1 for clean per-step numbers.
+    """
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    if profile_path is not None:
+        profiler = cProfile.Profile()
+        profiler.runcall(spec["function"], context)
+        profiler.dump_stats(profile_path.with_suffix(".prof"))
+    else:
+        spec["function"](context)
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    resources = {**usage_delta(before, after), "max_rss_kb": after.ru_maxrss}
+    if profile_path is not None:
+        resources["profile"] = str(profile_path.with_suffix(".prof"))
+    return "SUCCESS", None, resources
+
+
+def run_step(spec, context, mode="subprocess", profile_dir=None):
+    """Run a step with its retries; its timeout applies to subprocesses only"""
+    profile_path = None
+    if profile_dir is not None:
+        profile_path = Path(profile_dir) / spec["name"].lower().replace(" ", "_")
+    for attempt in range(spec["retries"] + 1):
+        start_time = datetime.now()
+        resources = {}
+        try:
+            if mode == "inprocess" and spec["function"] is not None:
+                status, error, resources = run_function(spec, context, profile_path)
+            else:
+                status, error, resources = run_command(spec, profile_path)
         except Exception as e:
-            print(f"ERROR: {step_name} error: {e}")
-            results[step_name] = "ERROR"
+            status, error = "ERROR", str(e)
+        duration = (datetime.now() - start_time).total_seconds()
+        if status == "SUCCESS":
+            break
+        if attempt < spec["retries"]:
+            print(f"RETRY: {spec['name']} {status.lower()} ({duration:.1f}s)")
+    return {
+        "status": status,
+        "duration": duration,
+        "attempts": attempt + 1,
+        "error": error,
+        **resources,
+    }
+
+
+def run_pipeline(
+    steps=STEPS,
+    workers=4,
+    force=False,
+    cache_path=CACHE_PATH,
+    mode="subprocess",
+    report_dir=REPORT_DIR,
+    profile=False,
+):
+    """Run steps as a dependency graph, independent steps in parallel
+
+    In "inprocess" mode steps with a function run in this process and pass
+    loaded data and models to later steps through a shared context instead
+    of re-reading files in fresh interpreters. Every run writes a JSON
+    report with each step's wall time, CPU time, peak RSS and block I/O to
+    report_dir; with `profile`, steps also leave profiler output there.
+    """
+    print(f"Starting CO₂ Forecast MLOps Pipeline ({mode})")
+    print("=" * 50)
+
+    names = {spec["name"] for spec in steps}
+    for spec in steps:
+        unknown = set(spec["deps"]) - names
+        if unknown:
+            raise ValueError(f"{spec['name']} depends on unknown steps {unknown}")
+    cache = load_cache(cache_path)
+    keys = {}
+    results = {}
+    running = {}
+    context = {"lock": threading.Lock()}
+    pipeline_start = datetime.now()
+    run_id = pipeline_start.strftime("run-%Y%m%dT%H%M%S%f")
+    report_dir = Path(report_dir)
+    profile_dir = report_dir / run_id if profile else None
+    if profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+    report = {"run_id": run_id, "mode": mode, "workers": workers, "steps": {}}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while len(results) < len(steps):
+            resolved = len(results)
+            for spec in steps:
+                name = spec["name"]
+                if name in results or name in running.values():
+                    continue
+                dep_status = [results.get(dep) for dep in spec["deps"]]
+                if any(s is None for s in dep_status):
+                    continue
+                if any(s not in ("SUCCESS", "CACHED") for s in dep_status):
+                    print(f"\nBLOCKED: {name} (upstream step did not succeed)")
+                    results[name] = "BLOCKED"
+                    continue
+
+                keys[name] = step_key(spec, keys, cache["files"])
+                previous = cache["steps"].get(name, {})
+                if (
+                    spec["cache"]
+                    and not force
+                    and previous.get("key") == keys[name]
+                    and all(Path(output).exists() for output in spec["outputs"])
+                ):
+                    print(f"\nCACHED: {name} (inputs unchanged)")
+                    results[name] = "CACHED"
+                    continue
+
+                print(f"\nRunning: {name}")
+                print(f"Command: {spec['command']}")
+                running[pool.submit(run_step, spec, context, mode, profile_dir)] = name
+
+            if not running:
+                if len(results) == resolved:
+                    raise ValueError("Pipeline steps have a dependency cycle")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                outcome = future.result()
+                results[name] = outcome["status"]
+                report["steps"][name] = {
+                    key: value for key, value in outcome.items() if key != "error"
+                }
+                duration = outcome["duration"]
+                if outcome["status"] == "SUCCESS":
+                    print(f"SUCCESS: {name} completed successfully ({duration:.1f}s)")
+                    cache["steps"][name] = {
+                        "key": keys[name],
+                        "finished": datetime.now().isoformat(),
+                    }
+                    save_cache(cache, cache_path)
+                else:
+                    print(f"{outcome['status']}: {name} ({duration:.1f}s)")
+                    print(f"Error: {outcome['error']}")
 
     # Summary
     print("\n" + "=" * 50)
     print("Pipeline Summary")
     print("=" * 50)
 
-    for step_name, status in results.items():
-        status_prefix = {
-            "SUCCESS": "SUCCESS",
-            "FAILED": "FAILED",
-            "TIMEOUT": "TIMEOUT",
-            "ERROR": "ERROR",
-        }
-        print(f"{status_prefix[status]}: {step_name}: {status}")
+    for spec in steps:
+        name = spec["name"]
+        step_report = report["steps"].setdefault(name, {"status": results[name]})
+        if "cpu_seconds" in step_report:
+            print(
+                f"{results[name]}: {name} ({step_report['duration']:.1f}s wall, "
+                f"{step_report['cpu_seconds']:.1f}s CPU, "
+                f"{step_report['max_rss_kb'] / 1024:.0f} MB peak RSS)"
+            )
+        else:
+            print(f"{results[name]}: {name}")
 
-    success_count = sum(1 for status in results.values() if status == "SUCCESS")
+    success_count = sum(s in ("SUCCESS", "CACHED") for s in results.values())
     total_count = len(results)
+    elapsed = (datetime.now() - pipeline_start).total_seconds()
     print(f"\nOverall: {success_count}/{total_count} steps completed successfully")
+    print(f"Total time ({mode}): {elapsed:.1f}s")
+
+    report["total_seconds"] = elapsed
+    report["finished"] = datetime.now().isoformat()
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_path = report_dir / f"{run_id}.json"
+    report_path.write_text(json.dumps(report, indent=2))
+    print(f"Run report: {report_path}")
 
     return results
 
 
+def latest_report(report_dir=REPORT_DIR):
+    reports = sorted(Path(report_dir).glob("run-*.json"))
+    return reports[-1] if reports else None
+
+
+def compare_reports(report, baseline, threshold=0.2, min_seconds=1.0):
+    """Regressions of `report` against `baseline`, one message per finding
+
+    A step regresses when its wall or CPU time grew by more than `threshold`
+    (ignoring steps shorter than `min_seconds` in both runs) or its peak RSS
+    grew by more than `threshold`. Steps not run in both reports are skipped.
+    """
+    regressions = []
+    for name, current in report["steps"].items():
+        previous = baseline["steps"].get(name, {})
+        if "cpu_seconds" not in current or "cpu_seconds" not in previous:
+            continue
+        for metric, label, unit, scale in [
+            ("duration", "wall time", "s", 1),
+            ("cpu_seconds", "CPU time", "s", 1),
+            ("max_rss_kb", "peak RSS", " MB", 1024),
+        ]:
+            old, new = previous[metric], current[metric]
+            if unit == "s" and max(old, new) < min_seconds:
+                continue
+            if old > 0 and new / old - 1 > threshold:
+                regressions.append(
+                    f"{name}: {label} {old / scale:.1f}{unit} -> "
+                    f"{new / scale:.1f}{unit} ({new / old - 1:+.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the MLOps pipeline")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="Ignore the step cache")
+    parser.add_argument(
+        "--mode", choices=["subprocess", "inprocess"], default="subprocess"
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Save py-spy/cProfile output per step"
+    )
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="Compare a run report to a baseline"
+    )
+    parser.add_argument("--report", help="Run report to compare (default: latest)")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.compare:
+        report_path = args.report or latest_report()
+        report = json.loads(Path(report_path).read_text())
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare_reports(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions in {report_path} against {args.compare}")
+        return
+
+    results = run_pipeline(
+        workers=args.workers, force=args.force, mode=args.mode, profile=args.profile
+    )
+    if any(s not in ("SUCCESS", "CACHED") for s in results.values()):
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    run_pipeline()
+    main()
@@ -0,0 +1,325 @@
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.config import STATE_ENCODING, TYPE_ENCODING
+from deployment.forecast_table import epoch_hour
+from monitoring.config import (
+    ACCURACY_ACTUALS_HOURS,
+    ACCURACY_DEGRADATION_FACTOR,
+    ACCURACY_LONG_WINDOW,
+    ACCURACY_MAE_THRESHOLD,
+    ACCURACY_MIN_PAIRS,
+    ACCURACY_PENDING_HOURS,
+    ACCURACY_PENDING_MAX_VALUES,
+    ACCURACY_PENDING_VALUES_PER_HOUR,
+    ACCURACY_SHORT_WINDOW,
+    ACCURACY_WINDOWS,
+)
+
+STATES_BY_CODE = {code: state for state, code in STATE_ENCODING.items()}
+TYPES_BY_CODE = {code: name for name, code in TYPE_ENCODING.items()}
+
+
+def timestamp_hours(timestamps):
+    """Whole hours since the epoch for a datetime Series (aware ones as UTC)"""
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    return timestamps.to_numpy().astype("datetime64[h]").astype(np.int64)
+
+
+class AccuracyTracker:
+    """Online error of served predictions against actual intensities
+
+    Predictions from the prediction log and actuals from the raw CSVs are
+    joined by (state, type, target hour) as either side arrives: whichever
+    comes first waits in a pending map until the other shows up or expires.
+    Matched errors are summed into hourly buckets covering the longest
+    window, so memory does not grow with the history; pending predictions
+    are capped per (series, hour) and in total, and the overflow is counted
+    as dropped. Log segments are read
+    from the byte offset reached last time and raw files are only re-read
+    when they change.
+    """
+
+    def __init__(self):
+        self.offsets = {}  # log segment -> bytes consumed
+        self.sources = {}  # raw CSV -> [size, mtime_ns] when last read
+        self.watermarks = {}  # series -> newest actual hour read
+        self.pending = {}  # series -> {target hour: {prediction: count}}
+        self.pending_values = 0  # Distinct predictions held in pending
+        self.actuals = {}  # series -> {hour: value}
+        self.buckets = {}  # target hour -> [pairs, abs, squared, ape, ape pairs]
+        self.matched = 0
+        self.expired = 0
+        self.dropped = 0  # Predictions over the pending caps
+        self.skipped = 0  # Malformed log lines
+
+    def read_predictions(self, log_dir):
+        """Add complete lines appended to log segments since the last read"""
+        segments = sorted(Path(log_dir).glob("predictions-*.jsonl"))
+        self.offsets = {
+            s.name: self.offsets[s.name] for s in segments if s.name in self.offsets
+        }
+        added = 0
+        for segment in segments:
+            offset = self.offsets.get(segment.name, 0)
+            if segment.stat().st_size <= offset:
+                continue
+            with open(segment, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # A partly written line waits
+            for line in data[:end].splitlines():
+                try:
+                    added += self.add_prediction(json.loads(line))
+                except (ValueError, KeyError, TypeError, IndexError):
+                    self.skipped += 1  # Malformed; must not block later lines
+            self.offsets[segment.name] = offset + end
+        return added
+
+    def add_prediction(self, record):
+        state, intensity_type = record["state"], record["type"]
+        features = record["features"]
+        if state is None and features:  # Batch rows only carry encoded features
+            state = STATES_BY_CODE.get(int(features[-2]))
+            intensity_type = TYPES_BY_CODE.get(int(features[-1]))
+        if state is None:
+            return 0
+
+        if record["target_time"]:
+            hour = epoch_hour(datetime.fromisoformat(record["target_time"]))
+        elif features:
+            # Next occurrence of the requested hour at or after serving time.
+            # Logs are UTC; older logs without an offset were written in local time
+            served_at = datetime.fromisoformat(record["timestamp"])
+            if served_at.tzinfo is None:
+                served_at = served_at.astimezone()
+            served = epoch_hour(served_at)
+            hour = served + (int(features[0]) - served) % 24
+        else:
+            return 0
+
+        key = f"{state}/{intensity_type}"
+        prediction = record["prediction"]
+        actual = self.actuals.get(key, {}).get(hour)
+        if actual is not None:
+            self.add_error(hour, prediction, actual)
+        else:
+            waiting = self.pending.setdefault(key, {}).setdefault(hour, {})
+            if prediction in waiting:
+                waiting[prediction] += 1
+            elif (
+                len(waiting) >= ACCURACY_PENDING_VALUES_PER_HOUR
+                or self.pending_values >= ACCURACY_PENDING_MAX_VALUES
+            ):
+                self.dropped += 1
+            else:
+                waiting[prediction] = 1
+                self.pending_values += 1
+        return 1
+
+    def read_actuals(self, data_dir):
+        """Add actual values from raw CSVs that changed since the last read
+
+        Rows newer than the series watermark are new; older rows are only
+        used if a prediction is waiting for them (backfilled gaps).
+        """
+        added = 0
+        for path in sorted(Path(data_dir).glob("*_intensity.csv")):
+            stat = path.stat()
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if self.sources.get(path.name) == signature:
+                continue
+            self.sources[path.name] = signature
+            state, intensity_type = path.name.split("_")[:2]
+            key = f"{state}/{intensity_type}"
+
+            df = pd.read_csv(path)
+            if list(df.columns) == ["0", "1"]:  # Legacy format
+                df.columns = ["timestamp", "value"]
+            if df.empty:
+                continue
+            hours = timestamp_hours(pd.to_datetime(df["timestamp"]))
+            values = df["value"].to_numpy(dtype=float)
+
+            newest = int(hours.max())
+            start = newest - ACCURACY_ACTUALS_HOURS
+            if key in self.watermarks:
+                start = max(start, self.watermarks[key])
+            waiting = np.fromiter(self.pending.get(key, {}), dtype=np.int64)
+            mask = (hours > start) | np.isin(hours, waiting)
+            mask &= np.isfinite(values)
+            for hour, value in zip(hours[mask].tolist(), values[mask].tolist()):
+                self.add_actual(key, hour, value)
+            added += int(mask.sum())
+            self.watermarks[key] = max(self.watermarks.get(key, newest), newest)
+        return added
+
+    def add_actual(self, key, hour, value):
+        waiting = self.pending.get(key, {}).pop(hour, {})
+        self.pending_values -= len(waiting)
+        for prediction, count in waiting.items():
+            self.add_error(hour, prediction, value, count)
+        self.actuals.setdefault(key, {})[hour] = value
+
+    def add_error(self, hour, prediction, actual, count=1):
+        error = abs(prediction - actual)
+        bucket = self.buckets.setdefault(hour, [0, 0.0, 0.0, 0.0, 0])
+        bucket[0] += count
+        bucket[1] += count * error
+        bucket[2] += count * error**2
+        if actual != 0:
+            bucket[3] += count * error / abs(actual)
+            bucket[4] += count
+        self.matched += count
+
+    @property
+    def latest_hour(self):
+        return max(self.watermarks.values(), default=None)
+
+    def prune(self):
+        """Drop buckets, actuals and pending predictions past their retention"""
+        latest = self.latest_hour
+        if latest is None:
+            return
+        oldest_bucket = latest - max(ACCURACY_WINDOWS.values())
+        self.buckets = {h: b for h, b in self.buckets.items() if h > oldest_bucket}
+        for key, actuals in self.actuals.items():
+            start = self.watermarks[key] - ACCURACY_ACTUALS_HOURS
+            self.actuals[key] = {h: v for h, v in actuals.items() if h > start}
+        for key, pending in self.pending.items():
+            start = latest - ACCURACY_PENDING_HOURS
+            expired = [waiting for h, waiting in pending.items() if h <= start]
+            self.expired += sum(sum(waiting.values()) for waiting in expired)
+            self.pending_values -= sum(len(waiting) for waiting in expired)
+            self.pending[key] = {h: w for h, w in pending.items() if h > start}
+
+    def update(self, log_dir, data_dir):
+        """Process new predictions and actuals; returns (predictions, actuals)"""
+        predictions = self.read_predictions(log_dir)
+        actuals = self.read_actuals(data_dir)
+        self.prune()
+        return predictions, actuals
+
+    def metrics(self):
+        """MAE, RMSE and MAPE per window, ending at the newest actual"""
+        latest = self.latest_hour
+        results = {}
+        for window, hours in ACCURACY_WINDOWS.items():
+            totals = np.zeros(5)
+            for hour, bucket in self.buckets.items():
+                if latest is not None and hour > latest - hours:
+                    totals += bucket
+            pairs, abs_sum, sq_sum, ape_sum, ape_pairs = totals
+            results[window] = {
+                "pairs": int(pairs),
+                "mae": abs_sum / pairs if pairs else None,
+                "rmse": np.sqrt(sq_sum / pairs) if pairs else None,
+                "mape": ape_sum / ape_pairs * 100 if ape_pairs else None,
+            }
+        return results
+
+    def alerts(self, metrics=None):
+        """Messages for a degraded short window"""
+        metrics = metrics or self.metrics()
+        short = metrics[ACCURACY_SHORT_WINDOW]
+        long = metrics[ACCURACY_LONG_WINDOW]
+        alerts = []
+        if short["pairs"] < ACCURACY_MIN_PAIRS:
+            return alerts
+        if short["mae"] > ACCURACY_MAE_THRESHOLD:
+            alerts.append(
+                f"{ACCURACY_SHORT_WINDOW} MAE {short['mae']:.1f} above "
+                f"{ACCURACY_MAE_THRESHOLD:.1f}"
+            )
+        if (
+            long["pairs"] > short["pairs"]
+            and short["mae"] > ACCURACY_DEGRADATION_FACTOR * long["mae"]
+        ):
+            alerts.append(
+                f"{ACCURACY_SHORT_WINDOW} MAE {short['mae']:.1f} is "
+                f"{short['mae'] / long['mae']:.1f}x the {ACCURACY_LONG_WINDOW} MAE"
+            )
+        return alerts
+
+    def flat_metrics(self, metrics=None):
+        """Metrics keyed like accuracy_24h_mae, for a single batched MLflow call"""
+        metrics = metrics or self.metrics()
+        flat = {
+            f"accuracy_{window}_{name}": value
+            for window, values in metrics.items()
+            for name, value in values.items()
+            if value is not None
+        }
+        flat["accuracy_pending"] = sum(
+            count
+            for pending in self.pending.values()
+            for waiting in pending.values()
+            for count in waiting.values()
+        )
+        flat["accuracy_expired"] = self.expired
+        flat["accuracy_dropped"] = self.dropped
+        flat["accuracy_skipped_lines"] = self.skipped
+        return flat
+
+    def save(self, path):
+        state = {
+            "offsets": self.offsets,
+            "sources": self.sources,
+            "watermarks": self.watermarks,
+            "pending": {
+                key: {str(h): list(w.items()) for h, w in pending.items()}
+                for key, pending in self.pending.items()
+            },
+            "actuals": {
+                key: {str(h): v for h, v in actuals.items()}
+                for key, actuals in self.actuals.items()
+            },
+            "buckets": {str(h): b for h, b in self.buckets.items()},
+            "matched": self.matched,
+            "expired": self.expired,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        tracker = cls()
+        if not Path(path).exists():
+            return tracker
+        state = json.loads(Path(path).read_text())
+        tracker.offsets = state["offsets"]
+        tracker.sources = state["sources"]
+        tracker.watermarks = state["watermarks"]
+        tracker.pending = {
+            key: {int(h): dict(w) for h, w in pending.items()}
+            for key, pending in state["pending"].items()
+        }
+        tracker.actuals = {
+            key: {int(h): v for h, v in actuals.items()}
+            for key, actuals in state["actuals"].items()
+        }
+        tracker.buckets = {int(h): b for h, b in state["buckets"].items()}
+        tracker.matched = state["matched"]
+        tracker.pending_values = sum(
+            len(waiting)
+            for pending in tracker.pending.values()
+            for waiting in pending.values()
+        )
+        tracker.expired = state["expired"]
+        tracker.dropped = state.get("dropped", 0)
+        tracker.skipped = state.get("skipped", 0)
+        return tracker
@@ -0,0 +1,35 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Monitoring configuration
+MONITORING_STATE_DIR = Path("data/monitoring")
+
+# Streaming drift detection
+DRIFT_FEATURES = ["value", "value_lag_1", "value_lag_24", "value_lag_168"]
+DRIFT_BIN_EDGES = np.linspace(0, 1000, 21)  # gCO₂/kWh, plus under/overflow bins
+DRIFT_REFERENCE_ROWS = 1000  # First rows of each series form the reference
+DRIFT_WINDOW_DAYS = 7  # Current window compared against the reference
+MEAN_DRIFT_THRESHOLD = 2.0  # Reference standard deviations
+STD_DRIFT_THRESHOLD = 0.5
+PSI_THRESHOLD = 0.25
+
+# Online accuracy from logged predictions joined with ingested actuals
+ACCURACY_WINDOWS = {"24h": 24, "7d": 168, "30d": 720}  # Hours of target time
+ACCURACY_SHORT_WINDOW = "24h"
+ACCURACY_LONG_WINDOW = "30d"
+ACCURACY_DEGRADATION_FACTOR = 1.5  # Alert if short MAE exceeds factor × long MAE
+ACCURACY_MAE_THRESHOLD = 100.0  # Alert if short MAE exceeds this (gCO₂/kWh)
+ACCURACY_MIN_PAIRS = 24  # Matched pairs needed in a window before alerting
+ACCURACY_PENDING_HOURS = 168  # Unmatched predictions expire this long after target
+# Unmatched predictions are kept as {value: count}; beyond these distinct values
+# per (series, target hour) and in total they are dropped and counted
+ACCURACY_PENDING_VALUES_PER_HOUR = 64
+ACCURACY_PENDING_MAX_VALUES = 100000
+ACCURACY_ACTUALS_HOURS = 168  # Actuals kept for predictions logged late
+
+# Resident monitoring daemon
+DAEMON_PORT = int(os.getenv("MONITOR_DAEMON_PORT", "8001"))
+DAEMON_INTERVALS = {"health": 30, "accuracy": 300, "drift": 3600}  # Seconds
+DAEMON_HISTORY_SIZE = 200  # Check results kept for /status
@@ -0,0 +1,247 @@
+import argparse
+import json
+import resource
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.config import DATA_DIR
+from deployment.config import PREDICTION_LOG_DIR
+from monitoring.accuracy import AccuracyTracker
+from monitoring.config import (
+    DAEMON_HISTORY_SIZE,
+    DAEMON_INTERVALS,
+    DAEMON_PORT,
+    MONITORING_STATE_DIR,
+)
+from monitoring.drift import DriftMonitor
+from monitoring.monitor import test_api_health
+
+
+class MonitoringDaemon:
+    """Resident scheduler for health, drift and accuracy checks
+
+    Drift sketches and the accuracy tracker stay in memory between cycles,
+    so each check only processes data that arrived since the previous one;
+    state is saved to disk after changes so a restart resumes where it
+    stopped. Check results go to bounded histories and numeric results to a
+    single MLflow run kept open for the daemon's lifetime.
+    """
+
+    def __init__(
+        self,
+        intervals=DAEMON_INTERVALS,
+        state_dir=MONITORING_STATE_DIR,
+        log_dir=PREDICTION_LOG_DIR,
+        raw_dir=DATA_DIR,
+        log_to_mlflow=True,
+    ):
+        self.intervals = dict(intervals)
+        self.drift_state_path = Path(state_dir) / "drift_state.json"
+        self.accuracy_state_path = Path(state_dir) / "accuracy_state.json"
+        self.log_dir = log_dir
+        self.raw_dir = raw_dir
+        self.log_to_mlflow = log_to_mlflow
+        self.drift = DriftMonitor.load(self.drift_state_path)
+        self.accuracy = AccuracyTracker.load(self.accuracy_state_path)
+        self.checks = {
+            "health": self.check_health,
+            "drift": self.check_drift,
+            "accuracy": self.check_accuracy,
+        }
+        self.next_run = {name: 0.0 for name in self.intervals}
+        self.stats = {
+            name: {"runs": 0, "failures": 0, "last_seconds": None, "last_run": None}
+            for name in self.intervals
+        }
+        self.history = deque(maxlen=DAEMON_HISTORY_SIZE)
+        self.alerts = deque(maxlen=DAEMON_HISTORY_SIZE)
+        self.latest = {}
+        self.started = time.time()
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()  # Status is read from the HTTP thread
+        self.mlflow_run = None
+        self.step = 0
+        self.log_failures = 0
+
+    def check_health(self):
+        health = test_api_health()
+        metrics = {"api_healthy": float(health["status"] == "healthy")}
+        if "response_time_seconds" in health:
+            metrics["api_response_seconds"] = health["response_time_seconds"]
+        return health, metrics
+
+    def check_drift(self):
+        if not any(Path(self.raw_dir).glob("*_intensity.csv")):
+            return {"status": "no data"}, {}
+        added = self.drift.refresh(self.raw_dir)
+        if added is not None:
+            self.drift.save(self.drift_state_path)
+        report = self.drift.report()
+        drifted = sorted(
+            f"{key} {feature}"
+            for key, features in report.items()
+            for feature, values in features.items()
+            if values["drift_detected"]
+        )
+        result = {
+            "rows_added": added or 0,
+            "series": len(report),
+            "alerts": [f"drift in {name}" for name in drifted],
+        }
+        return result, {"drift_features_detected": len(drifted)}
+
+    def check_accuracy(self):
+        predictions, actuals = self.accuracy.update(self.log_dir, self.raw_dir)
+        if predictions or actuals:
+            self.accuracy.save(self.accuracy_state_path)
+        metrics = self.accuracy.metrics()
+        result = {
+            "predictions_added": predictions,
+            "actuals_added": actuals,
+            "windows": metrics,
+            "alerts": self.accuracy.alerts(metrics),
+        }
+        return result, self.accuracy.flat_metrics(metrics)
+
+    def run_check(self, name):
+        started = time.perf_counter()
+        try:
+            result, metrics = self.checks[name]()
+            ok = True
+        except Exception as e:
+            result, metrics, ok = {"error": str(e)}, {}, False
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            stats = self.stats[name]
+            stats["runs"] += 1
+            stats["failures"] += not ok
+            stats["last_seconds"] = elapsed
+            stats["last_run"] = datetime.now().isoformat()
+            self.latest[name] = result
+            for alert in result.get("alerts", []):
+                self.alerts.append(f"{stats['last_run']} {name}: {alert}")
+            self.history.append(
+                {"check": name, "at": stats["last_run"], "seconds": elapsed, "ok": ok}
+            )
+        metrics[f"monitor_{name}_seconds"] = elapsed
+        self.log_metrics(metrics)
+
+    def log_metrics(self, metrics):
+        """Append one batch of metrics to the daemon's long-lived MLflow run
+
+        A failed log is reported and skipped; it never stops the schedule.
+        """
+        if not self.log_to_mlflow:
+            return
+        self.step += 1
+        try:
+            import mlflow
+
+            if self.mlflow_run is None:
+                self.mlflow_run = mlflow.start_run(run_name="monitoring-daemon")
+                mlflow.log_params({"monitoring_type": "daemon", **self.intervals})
+            mlflow.log_metrics(metrics, step=self.step)
+        except Exception as e:
+            self.log_failures += 1
+            print(f"MLflow logging failed at step {self.step}: {e}")
+
+    def run_due(self):
+        """Run every check whose interval elapsed; returns seconds to the next one"""
+        now = time.monotonic()
+        for name, due in self.next_run.items():
+            if due <= now:
+                self.run_check(name)
+                self.next_run[name] = time.monotonic() + self.intervals[name]
+        return max(0.0, min(self.next_run.values()) - time.monotonic())
+
+    def run(self):
+        try:
+            while not self.stopped.is_set():
+                self.stopped.wait(self.run_due())
+        finally:
+            if self.mlflow_run is not None:
+                import mlflow
+
+                mlflow.end_run()
+
+    def status(self):
+        with self.lock:
+            return self.snapshot()
+
+    def snapshot(self):
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "mlflow_log_failures": self.log_failures,
+            "checks": {
+                name: {
+                    "interval_seconds": self.intervals[name],
+                    **self.stats[name],
+                    "result": self.latest.get(name),
+                }
+                for name in self.intervals
+            },
+            "recent_alerts": list(self.alerts),
+            "history": list(self.history),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+
+def serve_status(daemon, port):
+    """Serve the daemon's status as JSON on /status from a background thread"""
+
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/status"):
+                self.send_error(404)
+                return
+            body = json.dumps(daemon.status(), default=str).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), StatusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run monitoring checks continuously")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    parser.add_argument("--once", action="store_true", help="Run each check once")
+    parser.add_argument("--no-mlflow", action="store_true")
+    args = parser.parse_args()
+
+    daemon = MonitoringDaemon(log_to_mlflow=not args.no_mlflow)
+    if args.once:
+        daemon.run_due()
+        print(json.dumps(daemon.status(), indent=2, default=str))
+        return
+
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stopped.set())
+    server = serve_status(daemon, args.port)
+    print(f"Monitoring daemon running, status on http://localhost:{args.port}/status")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.config import DATA_DIR
+from monitoring.config import (
+    DRIFT_BIN_EDGES,
+    DRIFT_FEATURES,
+    DRIFT_REFERENCE_ROWS,
+    DRIFT_WINDOW_DAYS,
+    MEAN_DRIFT_THRESHOLD,
+    MONITORING_STATE_DIR,
+    PSI_THRESHOLD,
+    STD_DRIFT_THRESHOLD,
+)
+
+
+class Sketch:
+    """Mergeable Welford mean/variance plus a fixed-bin histogram"""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, hist=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.hist = np.zeros(len(DRIFT_BIN_EDGES) + 1, dtype=np.int64)
+        if hist is not None:
+            self.hist[:] = hist
+
+    def update(self, values):
+        """Add a batch of values in one vectorized step"""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values):
+            mean = values.mean()
+            self.merge_moments(len(values), mean, ((values - mean) ** 2).sum())
+            self.hist += np.bincount(
+                np.searchsorted(DRIFT_BIN_EDGES, values, side="right"),
+                minlength=len(self.hist),
+            )
+
+    def merge_moments(self, count, mean, m2):
+        """Chan et al. parallel update of count, mean and M2"""
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta**2 * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+
+    def merge(self, other):
+        if other.count:
+            self.merge_moments(other.count, other.mean, other.m2)
+            self.hist += other.hist
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "hist": self.hist.tolist(),
+        }
+
+
+def compare_sketches(reference, current):
+    """Mean/std drift in reference standard deviations, PSI and histogram KS"""
+    p = reference.hist / reference.count
+    q = current.hist / current.count
+    p_safe, q_safe = np.maximum(p, 1e-4), np.maximum(q, 1e-4)
+    reference_std = reference.std or 1.0
+    mean_drift = abs(current.mean - reference.mean) / reference_std
+    std_drift = abs(current.std - reference.std) / reference_std
+    psi = float(((q_safe - p_safe) * np.log(q_safe / p_safe)).sum())
+    return {
+        "mean_drift": mean_drift,
+        "std_drift": std_drift,
+        "psi": psi,
+        "ks": float(np.abs(np.cumsum(p) - np.cumsum(q)).max()),
+        "drift_detected": bool(
+            mean_drift > MEAN_DRIFT_THRESHOLD
+            or std_drift > STD_DRIFT_THRESHOLD
+            or psi > PSI_THRESHOLD
+        ),
+    }
+
+
+class DriftMonitor:
+    """Per-(state, type) and per-feature drift sketches, updated incrementally
+
+    The first DRIFT_REFERENCE_ROWS rows of each series form its reference;
+    later rows go to daily sketches of which the last DRIFT_WINDOW_DAYS are
+    kept, so memory stays fixed. A watermark per series makes each update
+    process only rows newer than those already seen.
+    """
+
+    def __init__(self):
+        self.reference = {}
+        self.windows = {}
+        self.watermarks = {}
+        self.sources = {}  # raw CSV -> [size, mtime_ns] when last read
+
+    def update(self, df):
+        """Add rows of timestamp, state, type and DRIFT_FEATURES columns"""
+        updated = 0
+        for (state, intensity_type), series in df.groupby(["state", "type"]):
+            key = f"{state}/{intensity_type}"
+            if key in self.watermarks:
+                series = series[series["timestamp"] > self.watermarks[key]]
+            if series.empty:
+                continue
+            series = series.sort_values("timestamp")
+            self.watermarks[key] = series["timestamp"].iloc[-1]
+            updated += len(series)
+
+            reference = self.reference.setdefault(
+                key, {feature: Sketch() for feature in DRIFT_FEATURES}
+            )
+            room = max(DRIFT_REFERENCE_ROWS - reference[DRIFT_FEATURES[0]].count, 0)
+            for feature in DRIFT_FEATURES:
+                reference[feature].update(series[feature].to_numpy()[:room])
+            series = series.iloc[room:]
+
+            # Only the newest days can still be inside the window
+            windows = self.windows.setdefault(key, {})
+            start = self.watermarks[key].floor("D") - pd.Timedelta(
+                days=DRIFT_WINDOW_DAYS - 1
+            )
+            series = series[series["timestamp"] >= start]
+            for day, rows in series.groupby(series["timestamp"].dt.floor("D")):
+                window = windows.setdefault(
+                    day.date().isoformat(),
+                    {feature: Sketch() for feature in DRIFT_FEATURES},
+                )
+                for feature in DRIFT_FEATURES:
+                    window[feature].update(rows[feature].to_numpy())
+            for day in [d for d in windows if d < start.date().isoformat()]:
+                del windows[day]
+        return updated
+
+    def refresh(self, data_dir):
+        """Update from raw CSVs that changed; rows added, or None if none changed
+
+        Series are read one file at a time, like AccuracyTracker.read_actuals,
+        so a refresh after ingestion never parses the whole processed dataset
+        and peak memory follows the largest series, not all of them.
+        """
+        added = None
+        for path in sorted(Path(data_dir).glob("*_intensity.csv")):
+            stat = path.stat()
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if self.sources.get(path.name) == signature:
+                continue
+            self.sources[path.name] = signature
+            state, intensity_type = path.name.split("_")[:2]
+            df = pd.read_csv(path)
+            if list(df.columns) == ["0", "1"]:  # Legacy format
+                df.columns = ["timestamp", "value"]
+            df = drift_features(df.assign(state=state, type=intensity_type))
+            added = (added or 0) + self.update(df)
+        return added
+
+    def report(self):
+        """Drift of the current window against the reference, per series and feature"""
+        report = {}
+        for key, reference in self.reference.items():
+            current = {feature: Sketch() for feature in DRIFT_FEATURES}
+            for window in self.windows.get(key, {}).values():
+                for feature in DRIFT_FEATURES:
+                    current[feature].merge(window[feature])
+            report[key] = {
+                feature: compare_sketches(reference[feature], current[feature])
+                for feature in DRIFT_FEATURES
+                if reference[feature].count > 1 and current[feature].count
+            }
+        return report
+
+    def save(self, path):
+        state = {
+            "reference": {
+                key: {f: s.to_dict() for f, s in sketches.items()}
+                for key, sketches in self.reference.items()
+            },
+            "windows": {
+                key: {
+                    day: {f: s.to_dict() for f, s in sketches.items()}
+                    for day, sketches in days.items()
+                }
+                for key, days in self.windows.items()
+            },
+            "watermarks": {k: t.isoformat() for k, t in self.watermarks.items()},
+            "sources": self.sources,
+            "bin_edges": DRIFT_BIN_EDGES.tolist(),
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        monitor = cls()
+        if not Path(path).exists():
+            return monitor
+        state = json.loads(Path(path).read_text())
+        if state.get("bin_edges") != DRIFT_BIN_EDGES.tolist():
+            return monitor  # Sketches from other bins cannot be merged; rebuild
+        monitor.reference = {
+            key: {f: Sketch(**s) for f, s in sketches.items()}
+            for key, sketches in state["reference"].items()
+        }
+        monitor.windows = {
+            key: {
+                day: {f: Sketch(**s) for f, s in sketches.items()}
+                for day, sketches in days.items()
+            }
+            for key, days in state["windows"].items()
+        }
+        monitor.watermarks = {
+            k: pd.Timestamp(t) for k, t in state["watermarks"].items()
+        }
+        monitor.sources = state.get("sources", {})
+        return monitor
+
+
+def drift_features(df):
+    """DRIFT_FEATURES of one raw series, as prepare_features computes them
+
+    Lags are taken over the series' rows in time order; rows without every
+    lag are dropped like in the processed dataset.
+    """
+    df = df.copy()
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df = df.sort_values("timestamp", kind="stable")
+    for feature in DRIFT_FEATURES:
+        if feature.startswith("value_lag_"):
+            df[feature] = df["value"].shift(int(feature.rsplit("_", 1)[1]))
+    return df.dropna(subset=DRIFT_FEATURES)
+
+
+def update_drift_monitor(data_dir, state_path):
+    """Load persisted sketches and add rows from raw CSVs that changed
+
+    A file is only parsed when its size or mtime differs from the last
+    update, so unchanged data costs one stat per file and one small JSON read.
+    """
+    monitor = DriftMonitor.load(state_path)
+    if monitor.refresh(data_dir) is not None:
+        monitor.save(state_path)
+    return monitor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update drift sketches and report")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="Raw CSVs")
+    parser.add_argument(
+        "--state", default=str(MONITORING_STATE_DIR / "drift_state.json")
+    )
+    args = parser.parse_args()
+
+    report = update_drift_monitor(args.data_dir, args.state).report()
+    drifted = [
+        f"{key} {feature}"
+        for key, features in report.items()
+        for feature, values in features.items()
+        if values["drift_detected"]
+    ]
+    print(f"{len(report)} series, {len(drifted)} drifted features")
+    for name in drifted:
+        print(f"  {name}")
@@ -1,13 +1,21 @@
+import argparse
 import json
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
-import mlflow
-import mlflow.tracking
 import numpy as np
 import pandas as pd
 import requests
 
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.config import DATA_DIR
+from deployment.config import PREDICTION_LOG_DIR
+from monitoring.accuracy import AccuracyTracker
+from monitoring.config import MONITORING_STATE_DIR
+from monitoring.drift import update_drift_monitor
+
 
 def calculate_model_metrics(y_true, y_pred):
     """Calculate monitoring metrics"""
@@ -23,24 +31,6 @@ def calculate_model_metrics(y_true, y_pred):
     }
 
 
-def monitor_data_drift(current_data, reference_data):
-    """Simple data drift monitoring"""
-    current_mean = current_data.mean()
-    reference_mean = reference_data.mean()
-    current_std = current_data.std()
-    reference_std = reference_data.std()
-
-    mean_drift = abs(current_mean - reference_mean) / reference_std
-    std_drift = abs(current_std - reference_std) / reference_std
-
-    return {
-        "mean_drift": mean_drift,
-        "std_drift": std_drift,
-        "drift_detected": mean_drift > 2.0 or std_drift > 0.5,
-        "timestamp": datetime.now().isoformat(),
-    }
-
-
 def test_api_health():
     """Monitor API health and response time"""
     start_time = datetime.now()
@@ -65,12 +55,17 @@ def test_api_health():
 
 
 def log_monitoring_metrics(metrics):
-    """Log monitoring metrics to MLflow"""
-    with mlflow.start_run():
-        for key, value in metrics.items():
-            if isinstance(value, (int, float)):
-                mlflow.log_metric(key, value)
+    """Log monitoring metrics to MLflow in one batched call"""
+    import mlflow
 
+    with mlflow.start_run():
+        mlflow.log_metrics(
+            {
+                key: value
+                for key, value in metrics.items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+        )
         mlflow.log_params(
             {
                 "monitoring_type": "model_performance",
@@ -90,23 +85,66 @@ def generate_monitoring_report():
     if "response_time_seconds" in health:
         print(f"Response Time: {health['response_time_seconds']:.3f}s")
 
-    # Load recent data for drift monitoring
+    # Per-series drift from persisted sketches; only new rows are processed
     try:
-        df = pd.read_csv("data/processed/ml_dataset.csv")
-        recent_data = df["value"].tail(1000)  # Last 1000 records
-        reference_data = df["value"].head(1000)  # First 1000 records
-
-        drift_metrics = monitor_data_drift(recent_data, reference_data)
-        print(f"Data Drift Detected: {drift_metrics['drift_detected']}")
-        print(f"Mean Drift: {drift_metrics['mean_drift']:.3f}")
-        print(f"Std Drift: {drift_metrics['std_drift']:.3f}")
+        monitor = update_drift_monitor(
+            DATA_DIR, MONITORING_STATE_DIR / "drift_state.json"
+        )
+        report = monitor.report()
+        drifted = {
+            f"{key} {feature}": metrics
+            for key, features in report.items()
+            for feature, metrics in features.items()
+            if metrics["drift_detected"]
+        }
+        print(f"Data Drift Detected: {bool(drifted)}")
+        print(f"Series monitored: {len(report)}, drifted features: {len(drifted)}")
+        worst = sorted(drifted.items(), key=lambda item: -item[1]["psi"])[:5]
+        for name, metrics in worst:
+            print(
+                f"  {name}: mean drift {metrics['mean_drift']:.3f}, "
+                f"std drift {metrics['std_drift']:.3f}, PSI {metrics['psi']:.3f}, "
+                f"KS {metrics['ks']:.3f}"
+            )
 
     except Exception as e:
         print(f"Data drift monitoring failed: {e}")
 
+    # Online accuracy of served predictions against ingested actuals
+    try:
+        state_path = MONITORING_STATE_DIR / "accuracy_state.json"
+        tracker = AccuracyTracker.load(state_path)
+        tracker.update(PREDICTION_LOG_DIR, DATA_DIR)
+        tracker.save(state_path)
+        accuracy = tracker.metrics()
+        for window, values in accuracy.items():
+            if values["pairs"]:
+                print(
+                    f"Accuracy {window}: MAE {values['mae']:.2f}, "
+                    f"RMSE {values['rmse']:.2f}, MAPE {values['mape']:.2f}% "
+                    f"({values['pairs']} pairs)"
+                )
+            else:
+                print(f"Accuracy {window}: no matched predictions")
+        for alert in tracker.alerts(accuracy):
+            print(f"ALERT: {alert}")
+        if tracker.matched:
+            log_monitoring_metrics(tracker.flat_metrics(accuracy))
+
+    except Exception as e:
+        print(f"Accuracy monitoring failed: {e}")
+
     print("=" * 50)
     print(f"Report generated at: {datetime.now().isoformat()}")
 
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print a one-off monitoring report and log accuracy to MLflow"
+    )
+    parser.parse_args()
     generate_monitoring_report()
+
+
+if __name__ == "__main__":
+    main()
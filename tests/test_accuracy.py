@@ -0,0 +1,149 @@
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.forecast_table import epoch_hour
+from monitoring import accuracy
+from monitoring.accuracy import AccuracyTracker
+
+
+def write_actuals(data_dir, hours, value):
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-01", periods=hours, freq="h"),
+            "value": value,
+        }
+    )
+    df.to_csv(data_dir / "BW_consumption_intensity.csv", index=False)
+
+
+def write_log(log_dir, records, mode="w"):
+    with open(log_dir / "predictions-20250101T000000000000.jsonl", mode) as f:
+        f.writelines(json.dumps(record) + "\n" for record in records)
+
+
+def record(prediction, target_time=None, timestamp="2025-01-01T00:30:00", hour=2):
+    features = [hour, 2, 1, 1, 0] + [300.0] * 6 + [1, 0]
+    return {
+        "timestamp": timestamp,
+        "state": "BW",
+        "type": "consumption",
+        "features": features,
+        "prediction": prediction,
+        "model_version": "3",
+        "target_time": target_time,
+    }
+
+
+def test_predictions_join_actuals_in_either_order(tmp_path):
+    """Test pairs match whether the prediction or the actual arrives first"""
+    log_dir, data_dir = tmp_path / "logs", tmp_path / "raw"
+    log_dir.mkdir()
+    data_dir.mkdir()
+    state_path = tmp_path / "accuracy_state.json"
+
+    # Actuals up to 01:00 exist; 05:00 is requested explicitly, 02:00 by hour
+    write_actuals(data_dir, 2, 100.0)
+    write_log(log_dir, [record(110.0, "2025-01-01T01:00:00"), record(120.0)])
+    tracker = AccuracyTracker()
+    assert tracker.update(log_dir, data_dir) == (2, 2)
+    assert tracker.matched == 1
+    tracker.save(state_path)
+
+    # Later cycle: more actuals arrive, a batch row is appended
+    tracker = AccuracyTracker.load(state_path)
+    write_actuals(data_dir, 6, 100.0)
+    batch_row = record(80.0, "2025-01-01T05:00:00")
+    batch_row["state"] = batch_row["type"] = None
+    write_log(log_dir, [batch_row], mode="a")
+    assert tracker.update(log_dir, data_dir) == (1, 4)
+
+    metrics = tracker.metrics()["24h"]
+    assert tracker.matched == 3
+    assert metrics["pairs"] == 3
+    assert metrics["mae"] == (10 + 20 + 20) / 3
+    assert tracker.flat_metrics()["accuracy_pending"] == 0
+
+
+def test_alert_on_degraded_short_window(tmp_path):
+    """Test a short window much worse than the long one raises an alert"""
+    tracker = AccuracyTracker()
+    tracker.watermarks["BW/consumption"] = 1000
+    for hour in range(300, 1001):
+        tracker.add_error(hour, 105.0 if hour <= 976 else 160.0, 100.0)
+
+    alerts = tracker.alerts()
+    assert len(alerts) == 1
+    assert "x the 30d MAE" in alerts[0]
+
+
+def test_serving_time_is_read_as_utc(tmp_path, monkeypatch):
+    """Test hour-only records join the same target hour on a non-UTC host"""
+    log_dir, data_dir = tmp_path / "logs", tmp_path / "raw"
+    log_dir.mkdir()
+    data_dir.mkdir()
+    write_actuals(data_dir, 24, 100.0)
+    # 00:30 UTC, logged with an offset and by an older logger in local time
+    utc_record = record(110.0, timestamp="2025-01-01T00:30:00+00:00", hour=22)
+    local_record = record(130.0, timestamp="2024-12-31T19:30:00", hour=22)
+    write_log(log_dir, [utc_record, local_record])
+
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        tracker = AccuracyTracker()
+        tracker.update(log_dir, data_dir)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert tracker.matched == 2
+    assert tracker.metrics()["24h"]["mae"] == (10 + 30) / 2
+
+
+def test_malformed_log_lines_are_skipped(tmp_path):
+    """Test a bad line is counted and the valid lines around it still join"""
+    log_dir, data_dir = tmp_path / "logs", tmp_path / "raw"
+    log_dir.mkdir()
+    data_dir.mkdir()
+    write_actuals(data_dir, 6, 100.0)
+    write_log(log_dir, [record(110.0, "2025-01-01T01:00:00")])
+    with open(log_dir / "predictions-20250101T000000000000.jsonl", "a") as f:
+        f.write('{"timestamp": "2025-01-01T00:30\n')
+        f.write(json.dumps({"state": "BW"}) + "\n")
+    write_log(log_dir, [record(130.0, "2025-01-01T03:00:00")], mode="a")
+
+    tracker = AccuracyTracker()
+    assert tracker.update(log_dir, data_dir) == (2, 6)
+    assert tracker.matched == 2
+    assert tracker.flat_metrics()["accuracy_skipped_lines"] == 2
+    # The offset moved past the bad lines, so they are not read again
+    assert tracker.update(log_dir, data_dir) == (0, 0)
+
+
+def test_pending_predictions_are_capped(tmp_path, monkeypatch):
+    """Test distinct waiting predictions are bounded and the overflow counted"""
+    monkeypatch.setattr(accuracy, "ACCURACY_PENDING_VALUES_PER_HOUR", 3)
+    monkeypatch.setattr(accuracy, "ACCURACY_PENDING_MAX_VALUES", 5)
+    tracker = AccuracyTracker()
+    for prediction in [1.0, 2.0, 3.0, 4.0, 1.0]:
+        tracker.add_prediction(record(prediction, "2025-01-01T05:00:00"))
+    for prediction in [5.0, 6.0, 7.0]:
+        tracker.add_prediction(record(prediction, "2025-01-01T06:00:00"))
+
+    assert tracker.pending_values == 5
+    assert tracker.flat_metrics()["accuracy_pending"] == 6
+    assert tracker.flat_metrics()["accuracy_dropped"] == 2
+
+    tracker.save(tmp_path / "state.json")
+    tracker = AccuracyTracker.load(tmp_path / "state.json")
+    tracker.add_actual("BW/consumption", epoch_hour(datetime(2025, 1, 1, 5)), 2.0)
+    assert tracker.pending_values == 2
+    assert tracker.matched == 4
+    assert tracker.dropped == 2
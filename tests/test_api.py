@@ -1,13 +1,20 @@
+import os
+import subprocess
 import sys
 from pathlib import Path
 
+import numpy as np
 import pytest
 import requests
 from fastapi.testclient import TestClient
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
+from deployment import api
 from deployment.api import app
+from deployment.metrics import BATCH_BUCKETS
+from deployment.wire_format import RAW_CONTENT_TYPE, encode_raw
+from experiments.config import FEATURE_COLUMNS
 
 client = TestClient(app)
 
@@ -89,3 +96,90 @@ def test_prediction_invalid_hour():
 
     response = client.post("/predict", json=payload)
     assert response.status_code == 400
+
+
+def test_metrics_endpoint():
+    """Test Prometheus metrics endpoint"""
+    client.get("/health")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "co2_api_in_flight_requests" in response.text
+    assert 'co2_api_request_seconds_count{path="/health",status="200"}' in response.text
+
+
+class ConstantModel:
+    """Predicts the same value for every row"""
+
+    def predict(self, features):
+        return np.full(len(features), 100.0)
+
+
+@pytest.fixture
+def serving(monkeypatch):
+    """API serving a ConstantModel as version "m1" without logging or shadow"""
+    monkeypatch.setattr(api, "prediction_logger", None)
+    monkeypatch.setattr(api, "shadow_evaluator", None)
+    api.set_model(ConstantModel(), "m1")
+    yield
+    api.set_model(None, None)
+
+
+def test_metrics_stage_seconds(serving):
+    """Test /predict stages are labelled by stage and model version"""
+    assert client.post("/predict", json={"hour": 5}).status_code == 200
+
+    text = client.get("/metrics").text
+    for stage in ["validate", "encode", "frame", "predict"]:
+        labels = f'path="/predict",stage="{stage}",model_version="m1"'
+        assert f"co2_api_stage_seconds_count{{{labels}}} 1" in text
+    # Serialization is request_seconds minus the stages, not a series of its own
+    assert 'stage="serialize"' not in text
+
+
+def test_metrics_batch_rows(serving):
+    """Test batch sizes land in the batch_rows histogram"""
+    histogram = api.metrics.histogram("batch_rows", (), BATCH_BUCKETS)
+    counts, total = list(histogram.counts), histogram.sum
+    matrix = np.zeros((30, len(FEATURE_COLUMNS)), dtype=np.float32)
+    response = client.post(
+        "/predict/batch",
+        content=encode_raw(FEATURE_COLUMNS, matrix),
+        headers={"content-type": RAW_CONTENT_TYPE},
+    )
+    assert response.status_code == 200
+
+    # One observation in the (10, 100] bucket
+    added = [after - before for after, before in zip(histogram.counts, counts)]
+    assert added == [0, 0, 1, 0, 0, 0, 0]
+    assert histogram.sum - total == 30
+    text = client.get("/metrics").text
+    assert 'co2_api_batch_rows_bucket{le="100"}' in text
+    labels = 'path="/predict/batch",stage="decode",model_version="m1"'
+    assert f"co2_api_stage_seconds_count{{{labels}}} 1" in text
+
+
+def test_metrics_disabled():
+    """Test METRICS_ENABLED=0 installs no middleware and hides /metrics"""
+    script = """
+from fastapi.testclient import TestClient
+from deployment.api import app
+from deployment.metrics import BATCH_BUCKETS
+from deployment.metrics import MetricsMiddleware
+client = TestClient(app)
+client.get("/health")
+print([m.cls for m in app.user_middleware].count(MetricsMiddleware))
+print(client.get("/metrics").status_code)
+"""
+    env = {**os.environ, "METRICS_ENABLED": "0", "PREDICTION_LOG_ENABLED": "0"}
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+
+    assert result.stdout.split()[-2:] == ["0", "404"]
@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from experiments.backtest import (
+    hourly_series,
+    origin_tensors,
+    run_backtest,
+    summarize,
+)
+
+
+class PersistenceModel:
+    """Predicts the previous hour's value"""
+
+    def predict(self, features):
+        return features["value_lag_1"].to_numpy()
+
+
+def test_origin_tensors_skip_gaps():
+    """Test windows are cut per origin and origins touching a gap are dropped"""
+    first_hour = np.datetime64("2025-01-01T00", "h")
+    values = np.arange(400, dtype=np.float32)
+    values[300] = np.nan
+    origins = first_hour + np.array([100, 200, 290, 310, 398])
+
+    history, actual, kept = origin_tensors(first_hour, values, origins, 4)
+    assert list((kept - first_hour).astype(int)) == [200, 290]
+    assert history[0, -1] == 199 and actual[0, 0] == 200
+    assert history.shape == (2, 168)
+
+
+def test_backtest_resumes_from_saved_chunks(tmp_path):
+    """Test errors by horizon and that saved chunks are not recomputed"""
+    timestamps = pd.date_range("2025-01-01", periods=24 * 10, freq="h")
+    df = pd.concat(
+        [
+            pd.DataFrame(
+                {"timestamp": timestamps, "value": 100.0, "state": s, "type": t}
+            )
+            for s, t in [
+                ("BW", "consumption"),
+                ("BY", "production"),
+                ("HE", "production"),
+            ]
+        ]
+    )
+    df.loc[df["state"] == "HE", "value"] = np.arange(240) % 2 * 10.0 + 100
+    series = hourly_series(df)
+    origins = np.datetime64("2025-01-08T00", "h") + np.arange(48)
+    encodings = {
+        "state_encoding": {"BW": 0, "BY": 1, "HE": 2},
+        "type_encoding": {"consumption": 0, "production": 1},
+    }
+
+    stats = run_backtest(
+        PersistenceModel(), series, origins, 3, encodings, tmp_path, chunk_size=2
+    )
+    report = summarize(stats)
+    assert report["by_state"]["BW"]["mae"] == 0
+    assert np.isclose(report["by_state"]["HE"]["mae"], 20 / 3)
+    assert report["by_horizon"][1]["count"] == 3 * 48
+
+    # Resuming reads the saved chunks instead of forecasting again
+    (tmp_path / "chunk-0001.csv").write_text((tmp_path / "chunk-0000.csv").read_text())
+    stats = run_backtest(None, series, origins, 3, encodings, tmp_path, chunk_size=2)
+    assert set(stats["state"]) == {"BW", "BY"}
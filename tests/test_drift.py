@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from monitoring.config import DRIFT_FEATURES
+from monitoring.drift import DriftMonitor, Sketch, update_drift_monitor
+
+
+def make_series(state, start, periods, level, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(level, 20, periods)
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range(start, periods=periods, freq="h"),
+            "state": state,
+            "type": "consumption",
+        }
+    )
+    for feature in DRIFT_FEATURES:
+        df[feature] = values
+    return df
+
+
+def test_sketch_matches_batch_statistics():
+    """Test merged batch updates give the same moments as one pass"""
+    values = np.random.default_rng(1).normal(300, 50, 1000)
+    sketch = Sketch()
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+
+    assert sketch.count == 1000
+    assert np.isclose(sketch.mean, values.mean())
+    assert np.isclose(sketch.std, values.std(ddof=1))
+    assert sketch.hist.sum() == 1000
+
+
+def write_raw(data_dir, state, *segments):
+    """Write one raw series CSV from (start, periods, level, seed) segments"""
+    raw = pd.concat(
+        make_series(state, *segment)[["timestamp", "value"]] for segment in segments
+    )
+    raw.to_csv(data_dir / f"{state}_consumption_intensity.csv", index=False)
+    return raw
+
+
+def test_drift_detected_per_series(tmp_path):
+    """Test only the shifted series drifts and updates are incremental"""
+    write_raw(tmp_path, "BW", ("2024-01-01", 1400, 300))
+    by = write_raw(
+        tmp_path,
+        "BY",
+        ("2024-01-01", 1168, 300),
+        ("2024-02-18 16:00", 200, 600, 2),
+    )
+    state_path = tmp_path / "drift_state.json"
+
+    monitor = update_drift_monitor(tmp_path, state_path)
+    report = monitor.report()
+    # Rows without all lags are dropped, as in the processed dataset
+    assert monitor.reference["BY/consumption"]["value"].count == 1000
+    assert not report["BW/consumption"]["value"]["drift_detected"]
+    assert report["BY/consumption"]["value"]["drift_detected"]
+    assert report["BY/consumption"]["value"]["psi"] > 1
+
+    # Unchanged files are not read again and reloaded sketches match
+    restored = DriftMonitor.load(state_path)
+    assert restored.refresh(tmp_path) is None
+    assert restored.report() == report
+
+    # An appended file only adds rows past its watermark
+    extra = make_series("BY", "2024-02-27", 10, 600, seed=3)[["timestamp", "value"]]
+    pd.concat([by, extra]).to_csv(
+        tmp_path / "BY_consumption_intensity.csv", index=False
+    )
+    assert restored.refresh(tmp_path) == 10
@@ -0,0 +1,77 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment import config
+from deployment.forecast_table import build_forecast_table, load_forecast_table
+
+ENCODINGS = {
+    "state_encoding": {"BW": 1, "BY": 2},
+    "type_encoding": {"consumption": 0, "production": 1},
+}
+
+
+class LastValueModel:
+    """Predicts the previous hour's value"""
+
+    def predict(self, features):
+        return features["value_lag_1"].to_numpy() + 1
+
+
+def test_build_and_lookup_forecast_table(tmp_path):
+    """Test forecast table publishing and lookups"""
+    timestamps = pd.date_range("2022-01-01", periods=200, freq="h")
+    df = pd.DataFrame(
+        {
+            "timestamp": np.tile(timestamps, 2),
+            "value": np.arange(400, dtype=float),
+            "state": ["BW"] * 200 + ["BY"] * 200,
+            "type": ["consumption"] * 400,
+        }
+    )
+
+    meta = build_forecast_table(
+        LastValueModel(), df, ENCODINGS, horizon=5, forecast_dir=tmp_path
+    )
+    table = load_forecast_table(tmp_path)
+
+    assert meta["base_time"] == "2022-01-09T08:00:00"
+    # The table follows the given encodings; the configured ones are untouched
+    assert meta["states"] == ["BW", "BY"]
+    assert len(config.STATE_ENCODING) == 13
+    assert table.lookup("BW", "consumption", datetime(2022, 1, 9, 8)) == 200
+    assert table.lookup("BW", "consumption", datetime(2022, 1, 9, 12)) == 204
+    assert table.lookup("BY", "consumption", datetime(2022, 1, 9, 8)) == 400
+
+    # Outside the horizon, off the hour or missing series fall back to the model
+    assert table.lookup("BW", "consumption", datetime(2022, 1, 9, 13)) is None
+    assert table.lookup("BW", "consumption", datetime(2022, 1, 9, 8, 30)) is None
+    assert table.lookup("BW", "production", datetime(2022, 1, 9, 8)) is None
+
+
+def test_stale_series_is_left_out(tmp_path):
+    """Test a series that stopped long before the others is not forecast"""
+    timestamps = pd.date_range("2022-01-01", periods=400, freq="h")
+    df = pd.DataFrame(
+        {
+            "timestamp": np.concatenate([timestamps, timestamps[:250]]),
+            "value": np.concatenate([np.full(400, 100.0), np.full(250, 50.0)]),
+            "state": ["BW"] * 400 + ["BY"] * 250,
+            "type": ["consumption"] * 650,
+        }
+    )
+
+    meta = build_forecast_table(
+        LastValueModel(), df, ENCODINGS, horizon=5, forecast_dir=tmp_path
+    )
+    table = load_forecast_table(tmp_path)
+    base_time = datetime.fromisoformat(meta["base_time"])
+
+    assert table.lookup("BW", "consumption", base_time) == 101
+    assert table.lookup("BY", "consumption", base_time) is None
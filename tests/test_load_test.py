@@ -0,0 +1,114 @@
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.load_test import (
+    compare_to_baseline,
+    load_request_log,
+    synthesize_requests,
+)
+from deployment import api
+from deployment.prediction_logger import PredictionLogger
+from experiments.config import FEATURE_COLUMNS
+
+
+class RecordingModel:
+    """Returns the first lag and remembers every feature row it was given"""
+
+    def __init__(self):
+        self.rows = []
+
+    def predict(self, features):
+        rows = np.asarray(features, dtype=np.float64)
+        self.rows.extend(map(tuple, rows))
+        return rows[:, 5]
+
+
+@pytest.fixture
+def serving(monkeypatch):
+    """API serving a RecordingModel without logging or shadow"""
+    monkeypatch.setattr(api, "prediction_logger", None)
+    monkeypatch.setattr(api, "shadow_evaluator", None)
+    model = RecordingModel()
+    api.set_model(model, "replay")  # Also clears the prediction cache
+    yield model
+    api.set_model(None, None)
+
+
+def test_replay_prediction_log(tmp_path, serving):
+    """Test logged predictions replay as the /predict requests that made them"""
+    row = (14, 2, 3, 1, 0, 210.0, 205.0, 200.0, 190.0, 185.0, 180.0, 6, 1)
+    batch = np.array([row, (3,) + row[1:11] + (1, 0)], dtype=np.float32)
+    logger = PredictionLogger(tmp_path, flush_seconds=60)
+    logger.log_prediction("NW", "production", row, 210.0, "1")
+    logger.log_prediction(
+        "BW", "consumption", None, 300.0, "table", datetime(2025, 1, 1)
+    )
+    logger.log_prediction("BW", "consumption", None, 300.0, "table")
+    logger.log_batch(batch, np.array([210.0, 210.0]), "1")
+    logger.flush()
+
+    entries = load_request_log(tmp_path)
+    client = TestClient(api.app)
+    statuses = [
+        client.post(path, json=payload).status_code for path, payload in entries
+    ]
+
+    assert [payload.get("state") for _, payload in entries] == ["NW", "BW", "NW", "BW"]
+    assert entries[1][1]["target_time"] == "2025-01-01T00:00:00"
+    assert statuses == [200] * 4
+    # The lookup misses the empty forecast table and predicts default features;
+    # the first batch row is the logged request again and hits the cache
+    assert len(serving.rows) == 3
+    assert serving.rows[0] == row
+    assert serving.rows[2] == tuple(batch[1])
+
+
+def test_load_request_log_formats(tmp_path):
+    """Test wrapped and bare payload lines are still replayed as given"""
+    path = tmp_path / "requests.jsonl"
+    lines = [{"path": "/predict", "payload": {"state": "BY"}}, {"hour": 3}]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n\n")
+
+    assert load_request_log(path) == [
+        ("/predict", {"state": "BY"}),
+        ("/predict", {"hour": 3}),
+    ]
+
+
+def test_synthesize_requests(serving):
+    """Test synthetic requests are valid, reproducible and partly repeated"""
+    entries = synthesize_requests(200, repeat_fraction=0.3, seed=1)
+    distinct = {json.dumps(payload, sort_keys=True) for _, payload in entries}
+    client = TestClient(api.app)
+
+    assert entries == synthesize_requests(200, repeat_fraction=0.3, seed=1)
+    assert 100 < len(distinct) < 180
+    assert all(
+        client.post(path, json=payload).status_code == 200
+        for path, payload in entries[:20]
+    )
+
+
+def run(p99, throughput):
+    """Load test results with the given p99 latency and throughput"""
+    return {
+        "latency_ms": {"p50": 1.0, "p95": 2.0, "p99": p99},
+        "throughput_rps": throughput,
+    }
+
+
+def test_compare_to_baseline_threshold():
+    """Test only p99 or throughput changes beyond the threshold regress"""
+    baseline = run(10.0, 100.0)
+
+    assert not compare_to_baseline(run(11.9, 81.0), baseline, threshold=0.2)
+    assert compare_to_baseline(run(12.1, 100.0), baseline, threshold=0.2)
+    assert compare_to_baseline(run(10.0, 79.0), baseline, threshold=0.2)
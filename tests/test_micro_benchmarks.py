@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.micro import compare, feature_frame, measure, raw_frame, setup
+
+
+def test_inputs_are_reproducible():
+    """Test synthetic inputs have the requested size and a fixed seed"""
+    assert len(raw_frame(1000)) == 1000
+    assert raw_frame(1000).equals(raw_frame(1000))
+    assert feature_frame(2000)["value_lag_168"].notna().all()
+
+
+def test_measure_feature_benchmark():
+    """Test a benchmark call is timed with best and median seconds"""
+    result = measure(setup("create_lag_features", 1000, None), repeats=2)
+
+    assert 0 < result["seconds"] <= result["median_seconds"]
+
+
+def test_compare_flags_regressions():
+    """Test only slowdowns above the threshold and the noise floor fail"""
+    baseline = {
+        "slower[10]": {"seconds": 0.010},
+        "similar[10]": {"seconds": 0.010},
+        "tiny[10]": {"seconds": 0.0001},
+    }
+    results = {
+        "slower[10]": {"seconds": 0.015},
+        "similar[10]": {"seconds": 0.011},
+        "tiny[10]": {"seconds": 0.0005},
+        "new[10]": {"seconds": 1.0},
+    }
+
+    assert compare(results, baseline, threshold=0.2) == ["slower[10]"]
@@ -0,0 +1,35 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.model_bundle import load_bundle, read_bundle_metadata
+from experiments.config import FEATURE_COLUMNS
+
+
+def test_load_bundle(tmp_path):
+    """Test a bundle loads with plain xgboost and keeps the feature order"""
+    X = pd.DataFrame(np.random.rand(50, len(FEATURE_COLUMNS)), columns=FEATURE_COLUMNS)
+    model = xgb.XGBRegressor(n_estimators=5).fit(X, np.random.rand(50))
+    model.save_model(tmp_path / "model-3.ubj")
+    meta = {
+        "model_version": "3",
+        "file": "model-3.ubj",
+        "feature_order": FEATURE_COLUMNS,
+        "state_encoding": {"BW": 0},
+        "type_encoding": {"consumption": 0},
+    }
+    (tmp_path / "metadata.json").write_text(json.dumps(meta))
+
+    loaded, loaded_meta = load_bundle(tmp_path)
+
+    assert loaded_meta["model_version"] == "3"
+    assert loaded.get_booster().feature_names == FEATURE_COLUMNS
+    assert np.allclose(loaded.predict(X), model.predict(X))
+    assert read_bundle_metadata(tmp_path / "missing") is None
@@ -0,0 +1,148 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment import api, config
+from experiments.config import FEATURE_COLUMNS
+
+
+class ConstantModel:
+    """Predicts the same value for every row"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, features):
+        return np.full(len(features), self.value)
+
+
+class SwappingModel(ConstantModel):
+    """Swaps in another model while its own prediction is in flight"""
+
+    def __init__(self, value, successor):
+        super().__init__(value)
+        self.successor = successor
+
+    def predict(self, features):
+        api.set_model(self.successor, "2")
+        return super().predict(features)
+
+
+@pytest.fixture
+def serving(monkeypatch):
+    """API state with version 1 serving and no logging or shadow"""
+    monkeypatch.setattr(api, "prediction_logger", None)
+    monkeypatch.setattr(api, "shadow_evaluator", None)
+    monkeypatch.setattr(api, "attempted_version", "1")
+    api.set_model(ConstantModel(100.0), "1")
+    loads = []
+
+    def load_version(version):
+        loads.append(version)
+        if version == "broken":
+            raise OSError("corrupt model file")
+        return ConstantModel(float(version) * 100), version, None
+
+    monkeypatch.setattr(api, "load_version", load_version)
+    yield loads
+    api.set_model(None, None)
+
+
+def test_poller_swaps_in_new_version(serving, monkeypatch):
+    """Test a newer version is loaded once and cached predictions are dropped"""
+    monkeypatch.setattr(api, "latest_version", lambda: "1")
+    asyncio.run(api.reload_if_updated())
+    assert serving == []
+
+    api.prediction_cache.put("1", (12,), 100.0)
+    monkeypatch.setattr(api, "latest_version", lambda: "2")
+    asyncio.run(api.reload_if_updated())
+    asyncio.run(api.reload_if_updated())
+
+    assert serving == ["2"]
+    assert api.model_version == "2"
+    assert api.model.value == 200.0
+    assert len(api.prediction_cache.entries) == 0
+
+
+def test_failed_load_keeps_old_model(serving, monkeypatch):
+    """Test a version that fails to load is not retried and 1 keeps serving"""
+    monkeypatch.setattr(api, "latest_version", lambda: "broken")
+    asyncio.run(api.reload_if_updated())
+    asyncio.run(api.reload_if_updated())
+
+    assert serving == ["broken"]
+    assert api.model_version == "1"
+    assert api.model.value == 100.0
+
+
+def test_fallback_model_is_not_reloaded(serving, monkeypatch):
+    """Test a run: fallback model is kept while the newest version is unchanged"""
+    api.set_model(ConstantModel(50.0), "run:abc")
+    monkeypatch.setattr(api, "latest_version", lambda: "1")
+    asyncio.run(api.reload_if_updated())
+
+    assert serving == []
+    assert api.model_version == "run:abc"
+
+
+def test_in_flight_request_keeps_pinned_model(serving):
+    """Test a request finishes on the model it started with across a swap"""
+    api.set_model(SwappingModel(100.0, ConstantModel(200.0)), "1")
+    client = TestClient(api.app)
+
+    assert client.post("/predict", json={}).json()["prediction"] == 100.0
+    assert api.model_version == "2"
+    assert client.post("/predict", json={}).json()["prediction"] == 200.0
+
+
+def bundle(version, feature_order=FEATURE_COLUMNS):
+    """Bundle metadata with encodings that differ from the configured ones"""
+    return {
+        "model_version": version,
+        "feature_order": feature_order,
+        "state_encoding": {"BW": 7},
+        "type_encoding": {"consumption": 1, "production": 0},
+    }
+
+
+def test_load_version_reports_loaded_bundle(monkeypatch):
+    """Test the version comes from the bundle actually loaded, not the first read"""
+    monkeypatch.setattr(api, "read_bundle_metadata", lambda: bundle("3"))
+    monkeypatch.setattr(api, "load_bundle", lambda: (ConstantModel(1.0), bundle("4")))
+
+    assert api.load_version("3")[1] == "4"
+
+
+def test_load_version_rejects_feature_order(monkeypatch):
+    """Test a bundle with a different feature order is never served"""
+    reordered = bundle("3", FEATURE_COLUMNS[::-1])
+    monkeypatch.setattr(api, "read_bundle_metadata", lambda: reordered)
+    monkeypatch.setattr(api, "load_bundle", lambda: (ConstantModel(1.0), reordered))
+
+    with pytest.raises(ValueError, match="feature"):
+        api.load_version("3")
+
+
+def test_set_model_replaces_encodings(serving, monkeypatch):
+    """Test a swap installs new read-only encodings and leaves the old intact"""
+    monkeypatch.setattr(api, "STATE_ENCODING", api.STATE_ENCODING)
+    monkeypatch.setattr(api, "TYPE_ENCODING", api.TYPE_ENCODING)
+    old_states = api.STATE_ENCODING
+
+    api.set_model(ConstantModel(1.0), "3", bundle("3"))
+
+    assert dict(api.STATE_ENCODING) == {"BW": 7}
+    assert api.TYPE_ENCODING["production"] == 0
+    assert old_states["BW"] == config.STATE_ENCODING["BW"] == 1
+    with pytest.raises(TypeError):
+        api.STATE_ENCODING["BY"] = 2
+    client = TestClient(api.app)
+    assert client.post("/predict", json={"state": "BY"}).status_code == 400
+    assert client.get("/schema").json()["state_encoding"] == {"BW": 7}
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from monitoring.daemon import MonitoringDaemon
+
+
+def test_daemon_runs_due_checks(tmp_path):
+    """Test checks run on their own intervals and failures are recorded"""
+    daemon = MonitoringDaemon(
+        intervals={"drift": 3600, "accuracy": 0},
+        state_dir=tmp_path,
+        log_dir=tmp_path,
+        raw_dir=tmp_path,
+        log_to_mlflow=False,
+    )
+    daemon.checks["accuracy"] = lambda: 1 / 0
+
+    daemon.run_due()
+    daemon.run_due()
+
+    status = daemon.status()
+    assert status["checks"]["drift"]["runs"] == 1
+    assert status["checks"]["drift"]["result"] == {"status": "no data"}
+    assert status["checks"]["accuracy"]["runs"] == 2
+    assert status["checks"]["accuracy"]["failures"] == 2
+    assert len(status["history"]) == 3
+
+
+class FailingMlflow:
+    """Stands in for mlflow with a tracking store that rejects metrics"""
+
+    def start_run(self, run_name=None):
+        return object()
+
+    def log_params(self, params):
+        pass
+
+    def log_metrics(self, metrics, step=None):
+        raise OSError("database is locked")
+
+
+def test_daemon_survives_mlflow_errors(tmp_path, monkeypatch):
+    """Test a failed MLflow log is counted and the schedule keeps running"""
+    monkeypatch.setitem(sys.modules, "mlflow", FailingMlflow())
+    daemon = MonitoringDaemon(
+        intervals={"accuracy": 0},
+        state_dir=tmp_path,
+        log_dir=tmp_path,
+        raw_dir=tmp_path,
+    )
+    daemon.checks["accuracy"] = lambda: ({}, {"accuracy_mae_24h": 1.0})
+
+    daemon.run_due()
+    daemon.run_due()
+
+    status = daemon.status()
+    assert status["checks"]["accuracy"]["runs"] == 2
+    assert status["checks"]["accuracy"]["failures"] == 0
+    assert status["mlflow_log_failures"] == 2
+    assert daemon.step == 2
@@ -0,0 +1,152 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from infra.pipeline import (
+    compare_reports,
+    latest_report,
+    run_command,
+    run_pipeline,
+    step,
+)
+
+WRITE_SCRIPT = """
+import sys, time
+from pathlib import Path
+time.sleep(float(sys.argv[3]))
+with open(sys.argv[1], "a") as f:
+    f.write(sys.argv[2] + "\\n")
+"""
+
+
+def make_steps(tmp_path, fail="none"):
+    script = tmp_path / "write.py"
+    script.write_text(WRITE_SCRIPT)
+    source = tmp_path / "source.txt"
+    if not source.exists():
+        source.write_text("v1")
+    runs = tmp_path / "runs.txt"
+
+    def command(name, seconds=0):
+        if name == fail:
+            return f"{sys.executable} -c raise(SystemExit(1))"
+        return f"{sys.executable} {script} {runs} {name} {seconds}"
+
+    return [
+        step("prepare", command("prepare"), inputs=[source], outputs=[runs]),
+        step("train", command("train", 0.5), deps=["prepare"], inputs=[script]),
+        step("validate", command("validate", 0.5), deps=["prepare"]),
+        step("export", command("export"), deps=["train"], retries=1),
+    ]
+
+
+def test_pipeline_runs_graph_and_caches(tmp_path):
+    """Test independent steps overlap and unchanged steps are skipped"""
+    cache_path = tmp_path / "cache.json"
+    results = run_pipeline(
+        make_steps(tmp_path), cache_path=cache_path, report_dir=tmp_path
+    )
+    assert set(results.values()) == {"SUCCESS"}
+    lines = (tmp_path / "runs.txt").read_text().split()
+    assert lines[0] == "prepare" and lines[-1] == "export"
+    # train and validate each sleep 0.5s; run back to back the pipeline
+    # would take at least as long as all steps together
+    report = json.loads(latest_report(tmp_path).read_text())
+    step_seconds = sum(s["duration"] for s in report["steps"].values())
+    assert report["total_seconds"] < step_seconds - 0.3
+
+    results = run_pipeline(
+        make_steps(tmp_path), cache_path=cache_path, report_dir=tmp_path
+    )
+    assert set(results.values()) == {"CACHED"}
+
+    # A changed input reruns its step and everything downstream of it
+    (tmp_path / "source.txt").write_text("v2")
+    results = run_pipeline(
+        make_steps(tmp_path), cache_path=cache_path, report_dir=tmp_path
+    )
+    assert set(results.values()) == {"SUCCESS"}
+
+
+def test_pipeline_blocks_downstream_of_failure(tmp_path):
+    """Test a failed step blocks its dependents but not unrelated steps"""
+    steps = make_steps(tmp_path, fail="train")
+    results = run_pipeline(
+        steps, cache_path=tmp_path / "cache.json", report_dir=tmp_path
+    )
+    assert results == {
+        "prepare": "SUCCESS",
+        "validate": "SUCCESS",
+        "train": "FAILED",
+        "export": "BLOCKED",
+    }
+
+
+def test_inprocess_steps_share_context(tmp_path):
+    """Test in-process steps pass data through the context, not files"""
+    seen = []
+
+    def load(context):
+        context["dataset"] = [1, 2, 3]
+
+    def train(context):
+        seen.append(sum(context["dataset"]))
+
+    steps = [
+        step("load", "false", function=load),
+        step("train", "false", deps=["load"], function=train),
+    ]
+    results = run_pipeline(
+        steps,
+        cache_path=tmp_path / "cache.json",
+        mode="inprocess",
+        report_dir=tmp_path,
+    )
+    assert set(results.values()) == {"SUCCESS"}
+    assert seen == [6]
+
+
+def test_run_report_and_compare(tmp_path):
+    """Test each run reports step resources and regressions are flagged"""
+    run_pipeline(
+        make_steps(tmp_path), cache_path=tmp_path / "c.json", report_dir=tmp_path
+    )
+    report = json.loads(latest_report(tmp_path).read_text())
+    train = report["steps"]["train"]
+    assert train["status"] == "SUCCESS"
+    assert train["duration"] >= 0.5
+    assert train["max_rss_kb"] > 0
+
+    slower = json.loads(json.dumps(report))
+    slower["steps"]["train"]["duration"] = 10.0
+    slower["steps"]["train"]["max_rss_kb"] *= 2
+    regressions = compare_reports(slower, report)
+    assert [r.split(":")[0] for r in regressions] == ["train", "train"]
+    assert compare_reports(report, report) == []
+
+
+SPAWN_SCRIPT = """
+import subprocess, sys, time
+# The grandchild writes its file only if it outlives the step timeout
+subprocess.Popen([sys.executable, "-c",
+    "import sys, time; time.sleep(1.5); open(sys.argv[1], 'w').write('late')",
+    sys.argv[1]])
+time.sleep(5)
+"""
+
+
+def test_timeout_kills_grandchildren(tmp_path):
+    """Test a timed-out step leaves no process of its own running"""
+    script = tmp_path / "spawn.py"
+    script.write_text(SPAWN_SCRIPT)
+    marker = tmp_path / "late.txt"
+    spec = step("slow", f"{sys.executable} {script} {marker}", timeout=0.5)
+
+    status, _, _ = run_command(spec)
+    time.sleep(2)
+
+    assert status == "TIMEOUT"
+    assert not marker.exists()
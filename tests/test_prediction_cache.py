@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.cache import PredictionCache
+
+
+def test_cache_hit_and_model_version():
+    """Test cached predictions are keyed by model version"""
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    cache.put("1", (12, 150.0), 180.0)
+
+    assert cache.get("1", (12, 150.0)) == 180.0
+    assert cache.get("2", (12, 150.0)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_lru_eviction():
+    """Test least recently used entries are evicted first"""
+    cache = PredictionCache(max_size=2, ttl_seconds=60)
+    cache.put("1", (1,), 1.0)
+    cache.put("1", (2,), 2.0)
+    cache.get("1", (1,))
+    cache.put("1", (3,), 3.0)
+
+    assert cache.get("1", (1,)) == 1.0
+    assert cache.get("1", (2,)) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl():
+    """Test expired entries are not served and are removed when looked up"""
+    cache = PredictionCache(max_size=10, ttl_seconds=0.01)
+    cache.put("1", (1,), 1.0)
+    time.sleep(0.02)
+
+    assert cache.get("1", (1,)) is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,83 @@
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment.prediction_logger import PredictionLogger
+
+
+def read_records(log_dir):
+    return [
+        json.loads(line)
+        for segment in sorted(log_dir.glob("predictions-*.jsonl"))
+        for line in segment.read_text().splitlines()
+    ]
+
+
+def test_logger_writes_and_rotates(tmp_path):
+    """Test records are flushed on close and segments rotate by size"""
+    logger = PredictionLogger(tmp_path, rotate_bytes=1)
+    logger.log_prediction("BW", "consumption", (12, 150.0), 180.0, "3")
+    logger.flush()
+    logger.log_prediction(
+        "BY", "production", None, 90.0, "3", target_time=datetime(2025, 1, 1, 5)
+    )
+    logger.log_batch(np.ones((2, 2), dtype=np.float32), np.array([1.0, 2.0]), "3")
+    logger.start()
+    logger.close()
+
+    records = read_records(tmp_path)
+    assert len(list(tmp_path.glob("predictions-*.jsonl"))) == 2
+    assert [r["prediction"] for r in records] == [180.0, 90.0, 1.0, 2.0]
+    assert records[0]["features"] == [12, 150.0]
+    assert records[1]["target_time"] == "2025-01-01T05:00:00"
+    assert records[2]["state"] is None
+
+
+@pytest.mark.parametrize("policy,kept", [("drop_newest", 1.0), ("drop_oldest", 2.0)])
+def test_logger_drop_policy(tmp_path, policy, kept):
+    """Test a full buffer drops records instead of blocking"""
+    logger = PredictionLogger(tmp_path, buffer_size=2, policy=policy)
+    for i in range(3):
+        logger.log_prediction("BW", "consumption", (i,), float(i), "3")
+
+    assert logger.stats()["dropped"] == 1
+    assert len(logger.buffer) == 2
+    assert logger.buffer[-1][4] == kept
+
+
+def test_logger_bounds_batch_rows(tmp_path):
+    """Test batch rows count against the buffer and oversized batches are refused"""
+    logger = PredictionLogger(tmp_path, buffer_size=10, policy="drop_oldest")
+    matrix = np.ones((4, 2), dtype=np.float32)
+    logger.log_prediction("BW", "consumption", (1,), 1.0, "3")
+    assert logger.log_batch(matrix, np.ones(4), "3")
+    assert logger.log_batch(matrix, np.ones(4), "3")
+    assert logger.stats()["buffered"] == 9
+
+    # Making room for four more rows evicts the single and the first batch
+    assert logger.log_batch(matrix, np.ones(4), "3")
+    assert logger.stats()["buffered"] == 8
+    assert logger.stats()["dropped"] == 5
+    assert not logger.log_batch(np.ones((11, 2)), np.ones(11), "3")
+    assert logger.stats()["dropped"] == 16
+
+
+def test_logger_writes_utc_and_skips_bad_records(tmp_path):
+    """Test timestamps are UTC and one unserializable record is skipped"""
+    logger = PredictionLogger(tmp_path)
+    logger.log_prediction("BW", "consumption", (1,), 1.0, "3")
+    logger.log_prediction("BW", "consumption", (object(),), 2.0, "3")
+    logger.log_prediction("BW", "consumption", (3,), 3.0, "3")
+    logger.start()
+    logger.close()
+
+    records = read_records(tmp_path)
+    assert [r["prediction"] for r in records] == [1.0, 3.0]
+    assert records[0]["timestamp"].endswith("+00:00")
+    assert logger.stats()["failed"] == 1
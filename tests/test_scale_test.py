@@ -0,0 +1,34 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks import scale_test
+
+
+def test_run_tier_isolates_stages(tmp_path, monkeypatch):
+    """Test stages run in the tier directory with its MLflow store, this
+    process keeps its own, and the API stage reports its load test"""
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", "sqlite:///real.db")
+    tier_dir = (tmp_path / "1x").resolve()
+    seen = []
+
+    def run_command(spec, env=None, cwd=None):
+        seen.append((env["MLFLOW_TRACKING_URI"], cwd))
+        if spec["name"] == "api":
+            load = {"throughput_rps": 500.0, "latency_ms": {"p99": 4.0}}
+            (tier_dir / "load_test.json").write_text(
+                json.dumps({**load, "error_rate": 0.0})
+            )
+        return "SUCCESS", "", {"max_rss_kb": 0, "cpu_seconds": 0.0}
+
+    monkeypatch.setattr(scale_test, "run_command", run_command)
+    results = scale_test.run_tier(tmp_path / "1x", 2, 1)
+
+    assert list(results) == ["generate", "prepare-data", "train-model", "drift", "api"]
+    assert set(seen) == {(f"sqlite:///{tier_dir}/mlflow.db", tier_dir)}
+    assert os.environ["MLFLOW_TRACKING_URI"] == "sqlite:///real.db"
+    assert results["api"]["throughput_rps"] == 500.0
+    assert results["api"]["p99_ms"] == 4.0
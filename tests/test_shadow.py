@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment import api
+from deployment.shadow import ShadowEvaluator
+from deployment.wire_format import RAW_CONTENT_TYPE, encode_raw
+from experiments.config import FEATURE_COLUMNS
+
+
+class OffsetModel:
+    """Predicts the first lag plus a constant offset"""
+
+    def __init__(self, offset):
+        self.offset = offset
+
+    def predict(self, features):
+        return np.asarray(features, dtype=np.float32)[:, 5] + self.offset
+
+
+def test_divergence_per_version():
+    """Test queued rows and batches are compared with every other version"""
+    evaluator = ShadowEvaluator(queue_rows=10)
+    evaluator.add_model("2", OffsetModel(3.0))
+    evaluator.add_model("3", OffsetModel(-1.0))
+    row = np.zeros(len(FEATURE_COLUMNS))
+    row[5] = 100.0
+    batch = np.tile(row, (4, 1))
+
+    evaluator.start()
+    assert evaluator.submit(tuple(row), 100.0, "1")
+    assert evaluator.submit(batch, np.full(4, 99.0), "1")
+    # Version 3 is serving here, so only version 2 compares these rows
+    assert evaluator.submit(batch, np.full(4, 99.0), "3")
+    evaluator.close()
+    stats = evaluator.stats()
+
+    assert stats["versions"]["2"]["count"] == 9
+    assert stats["versions"]["2"]["max_abs_diff"] == 4.0
+    assert np.isclose(stats["versions"]["2"]["mean_abs_diff"], (3 + 8 * 4) / 9)
+    assert stats["versions"]["3"]["count"] == 5
+    assert np.isclose(stats["versions"]["3"]["mean_diff"], (-1 + 4 * 0) / 5)
+    assert stats["submitted"] == 3
+    assert stats["dropped"] == 0
+
+
+def test_full_queue_drops_work():
+    """Test submissions beyond the row bound are dropped, not waited for"""
+    evaluator = ShadowEvaluator(queue_rows=2)
+    assert not evaluator.submit((0.0,) * 13, 1.0, "1")  # No shadow models yet
+
+    evaluator.add_model("2", OffsetModel(0.0))
+    results = [evaluator.submit((0.0,) * 13, 1.0, "1") for _ in range(5)]
+
+    assert results == [True, True, False, False, False]
+    assert evaluator.stats()["dropped"] == 3
+    assert evaluator.stats()["queued_rows"] == 2
+
+
+def test_queue_is_bounded_by_rows():
+    """Test a batch larger than the row bound is dropped and rows are freed"""
+    evaluator = ShadowEvaluator(queue_rows=100)
+    evaluator.add_model("2", OffsetModel(0.0))
+    large = np.zeros((101, len(FEATURE_COLUMNS)))
+    batch = np.zeros((60, len(FEATURE_COLUMNS)))
+
+    assert not evaluator.submit(large, np.zeros(101), "1")
+    assert evaluator.submit(batch, np.zeros(60), "1")
+    assert not evaluator.submit(batch, np.zeros(60), "1")
+    assert evaluator.stats()["queued_rows"] == 60
+
+    evaluator.flush()
+    assert evaluator.stats()["queued_rows"] == 0
+    assert evaluator.submit(batch, np.zeros(60), "1")
+    assert evaluator.stats()["dropped"] == 2
+
+
+def test_api_reports_shadow_divergence():
+    """Test /predict and /predict/batch feed the shadow on /shadow and /metrics"""
+    evaluator = ShadowEvaluator()
+    evaluator.add_model("shadow", OffsetModel(5.0))
+    evaluator.start()
+    api.shadow_evaluator = evaluator
+    api.set_model(OffsetModel(0.0), "serving")
+    client = TestClient(api.app)
+    try:
+        response = client.post("/predict", json={"value_lag_1": 200.0})
+        assert response.json()["prediction"] == 200.0
+        matrix = np.zeros((3, len(FEATURE_COLUMNS)), dtype=np.float32)
+        client.post(
+            "/predict/batch",
+            content=encode_raw(FEATURE_COLUMNS, matrix),
+            headers={"content-type": RAW_CONTENT_TYPE},
+        ).raise_for_status()
+        evaluator.close()
+        shadow = client.get("/shadow").json()
+    finally:
+        api.shadow_evaluator = None
+        api.set_model(None, None)
+
+    assert shadow["serving_version"] == "serving"
+    assert shadow["versions"]["shadow"]["count"] == 4
+    assert shadow["versions"]["shadow"]["mean_abs_diff"] == 5.0
+    assert client.get("/shadow").status_code == 404
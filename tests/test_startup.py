@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.import_time import ROOT, TARGETS, measure
+
+
+@pytest.mark.parametrize(
+    "args",
+    [args for _, args in TARGETS] + [["-c", "import experiments.train_model"]],
+)
+def test_startup_skips_heavy_imports(args):
+    """Test the API and CLIs start without loading mlflow, xgboost or sklearn"""
+    result = measure(args, repeats=1)
+    assert result["returncode"] == 0
+    assert result["heavy_imports"] == []
+
+
+@pytest.mark.parametrize("script", ["monitoring/monitor.py", "experiments/predict.py"])
+def test_help_has_no_side_effects(script):
+    """Test --help exits before creating the tracking store or monitoring state"""
+    outputs = [ROOT / "mlflow.db", ROOT / "data/monitoring/accuracy_state.json"]
+    existing = [path.exists() for path in outputs]
+    assert measure([script, "--help"], repeats=1)["returncode"] == 0
+    assert [path.exists() for path in outputs] == existing
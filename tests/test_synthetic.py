@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from data_ingestion.synthetic import region_codes, write_synthetic_store
+from data_processing.prepare_features import available_states, load_and_combine_data
+
+
+def test_synthetic_store_layout(tmp_path):
+    """Test files follow the raw-store layout and load like fetched data"""
+    codes = write_synthetic_store(tmp_path, regions=15, years=0.1, legacy_fraction=0.5)
+
+    assert codes == region_codes(15)
+    assert codes[-2:] == ["R014", "R015"]
+    assert available_states(tmp_path) == sorted(codes)
+    headers = {
+        path.read_text().splitlines()[0] for path in tmp_path.glob("*_intensity.csv")
+    }
+    assert headers == {"timestamp,value", "0,1"}
+
+    df = load_and_combine_data(codes, data_dir=tmp_path)
+    assert set(df["state"]) == set(codes)
+    assert set(df["type"]) == {"consumption", "production"}
+    assert pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+    assert df["value"].notna().all()
+
+
+def test_synthetic_series_has_gaps_and_duplicates(tmp_path):
+    """Test generated series contain the irregularities of real fetches"""
+    write_synthetic_store(tmp_path, regions=2, years=1.0, legacy_fraction=0.0)
+    df = pd.read_csv(tmp_path / "BW_consumption_intensity.csv", parse_dates=[0])
+
+    assert df["timestamp"].duplicated().any()
+    assert df["timestamp"].nunique() < 8760
+    assert df["timestamp"].is_monotonic_increasing
@@ -0,0 +1,126 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from data_processing.validate_raw import (
+    dst_hours,
+    gap_batches,
+    gap_index,
+    scan_series,
+    validate_raw,
+)
+
+
+def test_dst_hours_europe_berlin():
+    """Test the skipped and repeated wall-clock hours of 2024"""
+    missing, repeated = dst_hours("2024-01-01", "2024-12-31")
+
+    assert [str(h) for h in missing] == ["2024-03-31T02"]
+    assert [str(h) for h in repeated] == ["2024-10-27T02"]
+
+
+def test_scan_series_classifies_issues():
+    """Test gaps, duplicates, DST hours and outliers are told apart"""
+    hours = np.arange(
+        np.datetime64("2024-03-30T00", "h"), np.datetime64("2024-04-02T00", "h")
+    )
+    values = 300 + 10 * np.sin(np.arange(len(hours)) / 4)
+    keep = np.ones(len(hours), dtype=bool)
+    keep[26] = False  # 2024-03-31T02, skipped by DST
+    keep[40:44] = False  # A real four-hour gap
+    values[60] = 900.0  # Spike
+    values[65] = -5.0  # Out of range
+    hours, values = hours[keep], values[keep]
+    # A duplicate row and two rows swapped
+    hours = np.insert(hours, 10, hours[9])
+    values = np.insert(values, 10, values[9])
+    hours[[20, 21]] = hours[[21, 20]]
+    values[[20, 21]] = values[[21, 20]]
+
+    missing, repeated = dst_hours(hours.min(), hours.max())
+    issues = scan_series(hours, values, missing, repeated)
+
+    assert issues["gaps"] == [["2024-03-31T16", "2024-03-31T19"]]
+    assert issues["missing_hours"] == 4
+    assert issues["dst_missing"] == ["2024-03-31T02"]
+    assert issues["duplicates"] == 1
+    assert issues["conflicting_duplicates"] == 0
+    assert issues["unordered"] == 1
+    assert issues["out_of_range"] == 1
+    assert issues["spikes"] == 1
+    assert issues["outlier_hours"] == ["2024-04-01T12", "2024-04-01T17"]
+
+
+def test_gap_batches_merge_days():
+    """Test gap spans become few, whole-day, bounded requests"""
+    spans = [
+        ["2024-01-01T05", "2024-01-01T07"],
+        ["2024-01-01T20", "2024-01-02T03"],
+        ["2024-01-10T00", "2024-01-25T23"],
+    ]
+
+    assert gap_batches(spans, batch_days=10) == [
+        ("2024-01-01", "2024-01-02"),
+        ("2024-01-10", "2024-01-19"),
+        ("2024-01-20", "2024-01-25"),
+    ]
+    assert gap_batches([]) == []
+
+
+def test_validate_raw_gap_index(tmp_path):
+    """Test a raw store scan yields a gap index of only the broken series"""
+    timestamps = pd.date_range("2024-01-01", periods=48, freq="h")
+    complete = pd.DataFrame({"timestamp": timestamps, "value": 300.0})
+    complete.to_csv(tmp_path / "BW_consumption_intensity.csv", index=False)
+    gappy = complete.drop(index=range(5, 8))
+    gappy.to_csv(tmp_path / "BW_production_intensity.csv", index=False)
+
+    report = validate_raw(tmp_path)
+    index = gap_index(report)
+
+    assert report["BW"]["consumption"]["gaps"] == []
+    assert index["series"] == {
+        "BW": {"production": [["2024-01-01T05", "2024-01-01T07"]]}
+    }
+
+
+def test_scan_series_edge_gaps():
+    """Test hours missing before the first and after the last row are gaps"""
+    hours = np.arange(
+        np.datetime64("2024-01-01T05", "h"), np.datetime64("2024-01-01T20", "h")
+    )
+    values = np.full(len(hours), 300.0)
+    expected = (np.datetime64("2024-01-01T00", "h"), np.datetime64("2024-01-01T23"))
+    missing, repeated = dst_hours(*expected)
+
+    issues = scan_series(hours, values, missing, repeated, expected)
+
+    assert issues["gaps"] == [
+        ["2024-01-01T00", "2024-01-01T04"],
+        ["2024-01-01T20", "2024-01-01T23"],
+    ]
+    assert issues["missing_hours"] == 9
+    assert scan_series(hours, values, missing, repeated)["gaps"] == []
+
+
+def test_validate_raw_expected_range(tmp_path):
+    """Test series are checked against the union of all series or given dates"""
+    timestamps = pd.date_range("2024-01-01", periods=48, freq="h")
+    complete = pd.DataFrame({"timestamp": timestamps, "value": 300.0})
+    complete.to_csv(tmp_path / "BW_consumption_intensity.csv", index=False)
+    late = complete.iloc[3:45]
+    late.to_csv(tmp_path / "BW_production_intensity.csv", index=False)
+
+    report = validate_raw(tmp_path)
+    extended = validate_raw(tmp_path, start="2024-01-01", end="2024-01-03")
+
+    assert report["BW"]["consumption"]["gaps"] == []
+    assert report["BW"]["production"]["gaps"] == [
+        ["2024-01-01T00", "2024-01-01T02"],
+        ["2024-01-02T21", "2024-01-02T23"],
+    ]
+    assert extended["BW"]["consumption"]["gaps"] == [["2024-01-03T00", "2024-01-03T23"]]
@@ -0,0 +1,109 @@
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from deployment import api
+from deployment.wire_format import (
+    ARROW_CONTENT_TYPE,
+    RAW_CONTENT_TYPE,
+    decode_arrow,
+    decode_raw,
+    encode_arrow,
+    encode_raw,
+)
+from experiments.config import FEATURE_COLUMNS
+
+
+def test_raw_round_trip():
+    """Test raw matrices decode to an aligned zero-copy view"""
+    matrix = np.arange(12, dtype=np.float32).reshape(4, 3)
+    body = encode_raw(["a", "b", "c"], matrix)
+
+    columns, decoded = decode_raw(body)
+
+    assert columns == ["a", "b", "c"]
+    assert np.array_equal(decoded, matrix)
+    assert not decoded.flags.owndata
+
+
+def test_arrow_round_trip():
+    """Test Arrow IPC streams decode to the same matrix"""
+    matrix = np.arange(12, dtype=np.float32).reshape(4, 3)
+
+    columns, decoded = decode_arrow(encode_arrow(["a", "b", "c"], matrix))
+
+    assert columns == ["a", "b", "c"]
+    assert np.array_equal(decoded, matrix)
+
+
+@pytest.mark.parametrize(
+    "content_type,encode,decode",
+    [
+        (RAW_CONTENT_TYPE, encode_raw, decode_raw),
+        (ARROW_CONTENT_TYPE, encode_arrow, decode_arrow),
+    ],
+)
+def test_batch_endpoint(content_type, encode, decode):
+    """Test /predict/batch matches the model and reorders columns"""
+    X = pd.DataFrame(np.random.rand(50, len(FEATURE_COLUMNS)), columns=FEATURE_COLUMNS)
+    model = xgb.XGBRegressor(n_estimators=5).fit(X, np.random.rand(50))
+    api.set_model(model, "test")
+    reordered = list(reversed(FEATURE_COLUMNS))
+
+    response = TestClient(api.app).post(
+        "/predict/batch",
+        content=encode(reordered, X[reordered].to_numpy()),
+        headers={"content-type": content_type},
+    )
+    api.set_model(None, None)
+
+    assert response.status_code == 200
+    columns, predictions = decode(response.content)
+    assert columns == ["prediction"]
+    assert np.allclose(predictions[:, 0], model.predict(X), atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "content_type,body",
+    [
+        (RAW_CONTENT_TYPE, b"\x01"),
+        (RAW_CONTENT_TYPE, struct.pack("<I", 4) + b"{no}"),
+        (RAW_CONTENT_TYPE, struct.pack("<I", 4) + b"[1] "),
+        (RAW_CONTENT_TYPE, encode_raw(FEATURE_COLUMNS, np.zeros((2, 13)))[:-4]),
+        (ARROW_CONTENT_TYPE, b"not an arrow stream"),
+        (ARROW_CONTENT_TYPE, encode_raw(FEATURE_COLUMNS, np.zeros((2, 13)))),
+    ],
+)
+def test_batch_endpoint_rejects_malformed_bodies(content_type, body):
+    """Test malformed bodies are client errors, not server errors"""
+    api.set_model(xgb.XGBRegressor(), "test")
+    response = TestClient(api.app).post(
+        "/predict/batch", content=body, headers={"content-type": content_type}
+    )
+    api.set_model(None, None)
+
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_ignores_content_type_parameters():
+    """Test a content type with parameters is matched by its media type"""
+    X = pd.DataFrame(np.random.rand(20, len(FEATURE_COLUMNS)), columns=FEATURE_COLUMNS)
+    api.set_model(xgb.XGBRegressor(n_estimators=2).fit(X, np.random.rand(20)), "test")
+
+    response = TestClient(api.app).post(
+        "/predict/batch",
+        content=encode_raw(FEATURE_COLUMNS, X.to_numpy()),
+        headers={"content-type": f"{RAW_CONTENT_TYPE}; charset=binary"},
+    )
+    api.set_model(None, None)
+
+    assert response.status_code == 200
+    assert decode_raw(response.content)[1].shape == (20, 1)